@@ -1,5 +1,21 @@
 # -*- coding: utf-8 -*-
+import os
+import sys
+
+# Helpers the spawned export workers run (see workers/monstar_gl_export.py)
+# are imported by their own name: a fresh interpreter has no addons path
+# behind odoo.addons, but it inherits the parent's sys.path.
+WORKERS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'workers')
+if WORKERS_PATH not in sys.path:
+    sys.path.append(WORKERS_PATH)
 
 from . import models
 from . import wizards
 from . import controllers
+
+
+def _post_init_hook(env):
+    # Counterpart accounts of the existing posted items, in one UPDATE
+    env['account.move.line']._fill_gl_counter_accounts()
+    # Seed the daily balance snapshots from the existing posted entries
+    env['account.daily.balance']._rebuild()
@@ -19,6 +19,7 @@
 
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
         'views/views.xml',
         'views/general_ledger_view.xml',
         'views/partner_ledger_view.xml',
@@ -29,11 +30,23 @@
         'views/res_partner_views.xml',
         'views/beta_view.xml',
         'views/party_stock_view.xml',
+        'views/account_daily_balance_view.xml',
 
 
         
         'views/menu.xml',
     ],
 
+    'post_init_hook': '_post_init_hook',
+
+    'assets': {
+        'web.assets_backend': [
+            'monstar_main/static/src/ledger_viewer/*',
+            'monstar_main/static/src/gl_ledger_viewer/*',
+            'monstar_main/static/src/plg_ledger_viewer/*',
+            'monstar_main/static/src/group_party_viewer/*',
+        ],
+    },
+
 }
 
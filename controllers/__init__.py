@@ -2,7 +2,12 @@
 
 from . import partner_ledger
 from . import general_ledger
+from . import general_ledger_parallel
+from . import general_ledger_stream
+from . import general_ledger_viewer
 from . import partner_ledger_group_export
+from . import partner_ledger_group_viewer
 from . import partner_ledger_export
 from . import pl_group_collpase
+from . import group_party_viewer
 from . import party_stock_summary
@@ -3,6 +3,8 @@ from odoo.http import request
 import io
 import xlsxwriter
 
+from monstar_gl_export import write_general_ledger_sheet
+
 
 class GeneralLedgerXlsxController(http.Controller):
 
@@ -10,182 +12,76 @@ class GeneralLedgerXlsxController(http.Controller):
     def export_xlsx(self, record_id):
         record = request.env['general.ledger'].browse(int(record_id))
         output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+        # A single-account ledger is streamed page by page: flush rows to
+        # disk as they are written instead of holding the sheet in memory.
+        workbook = xlsxwriter.Workbook(
+            output,
+            {'constant_memory': True} if record.account_id else {'in_memory': True},
+        )
         sheet = workbook.add_worksheet('General Ledger')
 
-        bold = workbook.add_format({'bold': True})
-        money = workbook.add_format({'num_format': '#,##0.00'})
+        # Same set-based engine as the HTML view: accounts with activity,
+        # their opening balance and period lines in a constant number of queries.
+        write_general_ledger_sheet(workbook, sheet, record._get_ledger_data())
 
-        # Column headers
-        row = 0
-        sheet.write(row, 0, "Account", bold)
-        sheet.write(row, 1, "Date", bold)
-        sheet.write(row, 2, "Label", bold)
-        sheet.write(row, 3, "Product Group", bold)
-        sheet.write(row, 4, "Counter Account", bold)
-        sheet.write(row, 5, "Debit", bold)
-        sheet.write(row, 6, "Credit", bold)
-        sheet.write(row, 7, "Balance", bold)
-        row += 1
-
-        AccountMoveLine = request.env['account.move.line'].sudo()
-        Account = request.env['account.account'].sudo()
-
-        # ✅ NEW: restrict accounts to the selected company (mirrors model)
-        account_domain = [('id', '=', record.account_id.id)] if record.account_id else []
-        if getattr(record, 'company_id', False):
-            account_domain.append(('company_ids', 'in', record.company_id.id))
-
-        accounts = (
-            Account.search(account_domain, order='code')
-            if account_domain
-            else Account.search([], order='code')
-        )
+        workbook.close()
+        output.seek(0)
+        filename = "general_ledger_report.xlsx"
 
-        for account in accounts:
-            # ---------------------------------------------------------
-            # 1) Base domain and opening balance (same idea as model)
-            # ---------------------------------------------------------
-            base_domain = [
-                ('account_id', '=', account.id),
-                ('move_id.state', '=', 'posted'),
+        return request.make_response(
+            output.read(),
+            headers=[
+                ('Content-Disposition', f'attachment; filename={filename}'),
+                ('Content-Type', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
             ]
-            if getattr(record, 'partner_id', False):
-                base_domain.append(('partner_id', '=', record.partner_id.id))
-            # ✅ NEW: company filter applied to all move line searches
-            if getattr(record, 'company_id', False):
-                base_domain.append(('company_id', '=', record.company_id.id))
-
-            opening_balance = 0.0
-            if record.date_from:
-                opening_domain = list(base_domain)
-                opening_domain.append(('date', '<', record.date_from))
-                opening_lines = AccountMoveLine.search(opening_domain)
-                for ol in opening_lines:
-                    opening_balance += (ol.debit or 0.0) - (ol.credit or 0.0)
-
-            # ---------------------------------------------------------
-            # 2) Period transactions domain
-            # ---------------------------------------------------------
-            period_domain = list(base_domain)
-            if record.date_from:
-                period_domain.append(('date', '>=', record.date_from))
-            if record.date_to:
-                period_domain.append(('date', '<=', record.date_to))
-
-            move_lines = AccountMoveLine.search(period_domain, order='date, id')
-
-            # If no period moves and no date filter at all → skip (as in model)
-            if not move_lines and not (record.date_from or record.date_to):
-                continue
-
-            # ---------------------------------------------------------
-            # 3) Account header row (always for included accounts)
-            # ---------------------------------------------------------
-            sheet.write(row, 0, f"{account.code} - {account.name}", bold)
-            row += 1
+        )
 
-            # ---------------------------------------------------------
-            # 4) Detail rows for the period
-            #     period_balance = period-only (kept for totals/closing)
-            #     running_balance starts from opening_balance so
-            #     each transaction row shows Opening + Period movement.
-            # ---------------------------------------------------------
-            period_balance = 0.0
-            period_debit_total = 0.0
-            period_credit_total = 0.0
-            account_rows = []
-
-            running_balance = opening_balance
-
-            for line in move_lines:
-                label = line.name or line.move_id.name or ""
-                product_group = (
-                    line.product_id.categ_id.name
-                    if line.product_id and line.product_id.categ_id
-                    else ""
-                )
-                counter_accounts = line.move_id.line_ids.filtered(
-                    lambda l: l != line and l.account_id != line.account_id
-                )
-                counter = ', '.join(
-                    set(
-                        f"{l.account_id.code} - {l.account_id.name}"
-                        for l in counter_accounts
-                    )
-                )
-
-                amount_dr = line.debit or 0.0
-                amount_cr = line.credit or 0.0
-
-                delta = amount_dr - amount_cr
-                period_balance += delta           # period-only (for totals/closing)
-                running_balance += delta          # opening + period (for row balance)
-
-                period_debit_total += amount_dr
-                period_credit_total += amount_cr
-
-                # Store the row to write later (after summary)
-                account_rows.append({
-                    'date': str(line.date),
-                    'label': label,
-                    'product_group': product_group,
-                    'counter': counter,
-                    'debit': amount_dr,
-                    'credit': amount_cr,
-                    'balance': running_balance,
-                })
-
-            # ---------------------------------------------------------
-            # 5) Summary row at TOP: Opening in Label, Closing text in Balance
-            # ---------------------------------------------------------
-            closing_balance = opening_balance + period_balance
-
-            opening_text = f"Opening Balance: {opening_balance:,.2f}"
-            closing_text = f"Closing: {closing_balance:,.2f}"
-
-            sheet.write(row, 0, "")                 # Account col empty (header above)
-            sheet.write(row, 1, "")                 # Date
-            sheet.write(row, 2, opening_text)       # Label
-            sheet.write(row, 3, "")                 # Product Group
-            sheet.write(row, 4, "")                 # Counter Account
-            sheet.write(row, 5, "")                 # Debit empty
-            sheet.write(row, 6, "")                 # Credit empty
-            sheet.write(row, 7, closing_text)       # Balance: "Closing: xxx"
-            row += 1
+    @http.route('/general_ledger/export_summary_xlsx', type='http', auth='user')
+    def export_summary_xlsx(self, record_id):
+        record = request.env['general.ledger'].browse(int(record_id))
+        months, summary = record._get_summary_data()
+        if not record.summary_by_month:
+            months = []
 
-            # ---------------------------------------------------------
-            # 6) Now write all transaction rows (with running balance)
-            # ---------------------------------------------------------
-            for r in account_rows:
-                sheet.write(row, 0, "")
-                sheet.write(row, 1, r['date'])
-                sheet.write(row, 2, r['label'])
-                sheet.write(row, 3, r['product_group'])
-                sheet.write(row, 4, r['counter'])
-                sheet.write_number(row, 5, r['debit'], money)
-                sheet.write_number(row, 6, r['credit'], money)
-                sheet.write_number(row, 7, r['balance'], money)  # opening+period
-                row += 1
-
-            # ---------------------------------------------------------
-            # 7) Bottom total row: period totals + closing balance
-            # ---------------------------------------------------------
-            sheet.write(row, 0, "")                    # Account
-            sheet.write(row, 1, "")                    # Date
-            sheet.write(row, 2, "Total")               # Label
-            sheet.write(row, 3, "")                    # Product Group
-            sheet.write(row, 4, "")                    # Counter Account
-            sheet.write_number(row, 5, period_debit_total, money)
-            sheet.write_number(row, 6, period_credit_total, money)
-            sheet.write_number(row, 7, closing_balance, money)
+        output = io.BytesIO()
+        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+        sheet = workbook.add_worksheet('Trial Balance')
+
+        bold = workbook.add_format({'bold': True})
+        money = workbook.add_format({'num_format': '#,##0.00'})
+        total_fmt = workbook.add_format({'bold': True, 'bg_color': '#D3D3D3', 'num_format': '#,##0.00'})
+
+        # Column headers: Account | Opening | one column per month | Debit | Credit | Closing
+        headers = ["Account", "Opening Balance"]
+        headers += [month.strftime('%b %Y') for month in months]
+        headers += ["Total Debit", "Total Credit", "Closing Balance"]
+        for col, header in enumerate(headers):
+            sheet.write(0, col, header, bold)
+        sheet.set_column(0, 0, 40)
+        sheet.set_column(1, len(headers) - 1, 15)
+
+        row = 1
+        totals = [0.0] * (len(headers) - 1)
+        for account_data in summary:
+            values = [account_data['opening_balance']]
+            for month in months:
+                debit, credit = account_data['months'].get(month, (0.0, 0.0))
+                values.append(debit - credit)
+            values += [account_data['debit'], account_data['credit'], account_data['closing_balance']]
+
+            sheet.write(row, 0, account_data['label'])
+            for col, value in enumerate(values, start=1):
+                sheet.write_number(row, col, value, money)
+                totals[col - 1] += value
             row += 1
 
-            row += 1  # Blank line between accounts
+        sheet.write(row, 0, "Total", bold)
+        for col, value in enumerate(totals, start=1):
+            sheet.write_number(row, col, value, total_fmt)
 
         workbook.close()
         output.seek(0)
-        filename = "general_ledger_report.xlsx"
+        filename = "general_ledger_trial_balance.xlsx"
 
         return request.make_response(
             output.read(),
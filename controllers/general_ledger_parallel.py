@@ -0,0 +1,142 @@
+import io
+import multiprocessing
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import xlsxwriter
+
+from odoo import http
+from odoo.http import request
+from odoo.sql_db import connection_info_for
+
+# Workers only import this standalone module, never odoo.addons
+import monstar_gl_export
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def _split_shards(ledger, shard_count):
+    """Split the (code-ordered) account headers into contiguous account
+    ranges holding roughly the same number of lines each."""
+    total = sum(account_data['line_count'] for account_data in ledger) or 1
+    target = total / shard_count
+    shards, current, current_lines = [], [], 0
+    for account_data in ledger:
+        current.append(account_data)
+        current_lines += account_data['line_count']
+        if current_lines >= target and len(shards) < shard_count - 1:
+            shards.append(current)
+            current, current_lines = [], 0
+    if current:
+        shards.append(current)
+    return shards
+
+
+def _shard_name(shard):
+    first = shard[0]['label'].split(" - ")[0]
+    last = shard[-1]['label'].split(" - ")[0]
+    name = first if first == last else f"{first}-{last}"
+    return re.sub(r'[\[\]:*?/\\]', '_', name)[:31]
+
+
+def get_export_worker_count(env):
+    """Worker processes of a sharded export: the
+    ``monstar_main.gl_export_workers`` system parameter, capped by the CPU
+    count."""
+    cpu_count = os.cpu_count() or 1
+    try:
+        workers = int(env['ir.config_parameter'].sudo().get_param('monstar_main.gl_export_workers', cpu_count))
+    except ValueError:
+        workers = cpu_count
+    return max(1, min(workers, cpu_count))
+
+
+def build_parallel_export(record, shards=None, as_zip=False):
+    """Sharded GL export of ``record``: the account list is split into
+    ranges that are read by separate processes, then merged into one
+    workbook with one sheet per account range, or into a ZIP of workbooks
+    built by the workers themselves (``as_zip``).
+
+    Returns ``(filename, content_type, content)``. The number of shards is
+    clamped to the worker count (see ``get_export_worker_count``) whatever
+    is asked for. Workers import the snapshot of ``record``'s transaction,
+    which must stay open until they are done.
+    """
+    ledger = record._get_ledger_accounts()
+    max_workers = get_export_worker_count(record.env)
+    try:
+        shard_count = int(shards or max_workers)
+    except ValueError:
+        shard_count = max_workers
+    shard_count = max(1, min(shard_count, max_workers, len(ledger) or 1))
+    opening = {
+        account_data['account'].id: (account_data['opening_debit'], account_data['opening_credit'])
+        for account_data in ledger
+    }
+
+    # Plain, picklable headers for the workers
+    headers = [{
+        'id': account_data['account'].id,
+        'label': account_data['label'],
+        'opening_balance': account_data['opening_balance'],
+        'period_debit': account_data['period_debit'],
+        'period_credit': account_data['period_credit'],
+        'closing_balance': account_data['closing_balance'],
+        'line_count': account_data['line_count'],
+    } for account_data in ledger]
+    account_shards = _split_shards(headers, shard_count)
+
+    # Workers import this transaction's snapshot: same numbers as serial
+    record.env.cr.execute("SELECT pg_export_snapshot()")
+    snapshot = record.env.cr.fetchone()[0]
+    connection_info = connection_info_for(record.env.cr.dbname)[1]
+
+    tasks = []
+    for shard in account_shards:
+        query = record._get_period_lines_sql(opening, [account_data['id'] for account_data in shard])
+        tasks.append((connection_info, snapshot, query.code, query.params, shard, as_zip))
+
+    results = []
+    if tasks:
+        with ProcessPoolExecutor(
+            max_workers=min(max_workers, len(tasks)),
+            mp_context=multiprocessing.get_context('spawn'),
+        ) as executor:
+            results = list(executor.map(monstar_gl_export.fetch_shard, *zip(*tasks)))
+
+    output = io.BytesIO()
+    if as_zip:
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive_file:
+            for shard, content in zip(account_shards, results):
+                archive_file.writestr(f"general_ledger_{_shard_name(shard)}.xlsx", content)
+        return "general_ledger_report.zip", 'application/zip', output.getvalue()
+
+    # Rows are written in order, so the merged workbook streams to disk
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    for shard in results:
+        monstar_gl_export.write_general_ledger_sheet(workbook, workbook.add_worksheet(_shard_name(shard)), shard)
+    if not results:
+        workbook.add_worksheet('General Ledger')
+    workbook.close()
+    return "general_ledger_report.xlsx", XLSX_MIMETYPE, output.getvalue()
+
+
+class GeneralLedgerParallelExportController(http.Controller):
+
+    @http.route('/general_ledger/export_xlsx_parallel', type='http', auth='user')
+    def export_xlsx_parallel(self, record_id, shards=None, archive=None, **kwargs):
+        """Synchronous sharded export (see ``build_parallel_export``). Year-end
+        ledgers should go through the background export of the form
+        (``general.ledger.action_export_xlsx_parallel``), which has no HTTP
+        timeout."""
+        record = request.env['general.ledger'].browse(int(record_id))
+        filename, content_type, content = build_parallel_export(record, shards=shards, as_zip=archive == 'zip')
+        return request.make_response(
+            content,
+            headers=[
+                ('Content-Disposition', f'attachment; filename={filename}'),
+                ('Content-Type', content_type),
+            ]
+        )
@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+
+from odoo import api, http
+from odoo.exceptions import UserError
+from odoo.http import request
+
+from ..models.general_ledger import GL_EXPORT_COLUMNS
+
+STREAM_FORMATS = {
+    'csv': ('general_ledger_report.csv', 'text/csv; charset=utf-8'),
+    'ndjson': ('general_ledger_report.ndjson', 'application/x-ndjson'),
+}
+
+
+def _encode_csv(pages):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(GL_EXPORT_COLUMNS)
+    for page in pages:
+        writer.writerows([row[column] for column in GL_EXPORT_COLUMNS] for row in page)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def _encode_ndjson(pages):
+    for page in pages:
+        yield "".join(json.dumps(row) + "\n" for row in page).encode()
+
+
+class GeneralLedgerStreamController(http.Controller):
+
+    @http.route('/general_ledger/export_stream', type='http', auth='user')
+    def export_stream(self, record_id, fmt='csv', **kwargs):
+        """Flat CSV / NDJSON export of the detailed ledger, sent in chunks.
+
+        The body is produced after this handler returns, once the request
+        cursor is closed, so the generator reads through a cursor of its own.
+        One keyset page is encoded and sent at a time: server memory does
+        not grow with the number of lines.
+        """
+        if fmt not in STREAM_FORMATS:
+            raise UserError(f"Unsupported export format: {fmt}")
+        filename, content_type = STREAM_FORMATS[fmt]
+        encode = _encode_csv if fmt == 'csv' else _encode_ndjson
+
+        record_id = int(record_id)
+        registry, uid, context = request.env.registry, request.env.uid, dict(request.env.context)
+        request.env['general.ledger'].browse(record_id).check_access('read')
+
+        def generate():
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                yield from encode(env['general.ledger'].browse(record_id)._iter_export_pages())
+
+        return request.make_response(
+            generate(),
+            headers=[
+                ('Content-Disposition', f'attachment; filename={filename}'),
+                ('Content-Type', content_type),
+            ]
+        )
@@ -0,0 +1,58 @@
+from odoo import fields, http
+
+from ..models.general_ledger import GL_PAGE_SIZE
+from .ledger_viewer import get_viewer_report
+
+
+class GeneralLedgerViewerController(http.Controller):
+    """JSON routes behind the ``gl_ledger_viewer`` widget."""
+
+    FILTER_FIELDS = ('date_from', 'date_to', 'account_id', 'partner_id', 'company_id')
+
+    def _get_ledger(self, filters):
+        return get_viewer_report('general.ledger', self.FILTER_FIELDS, filters)
+
+    @http.route('/general_ledger/viewer/accounts', type='json', auth='user')
+    def accounts(self, filters=None):
+        ledger = self._get_ledger(filters)
+        return [{
+            'id': account_data['account'].id,
+            'label': account_data['label'],
+            'opening_balance': account_data['opening_balance'],
+            'period_debit': account_data['period_debit'],
+            'period_credit': account_data['period_credit'],
+            'closing_balance': account_data['closing_balance'],
+            'line_count': account_data['line_count'],
+        } for account_data in ledger._get_ledger_accounts()]
+
+    @http.route('/general_ledger/viewer/lines', type='json', auth='user')
+    def lines(self, account_id, filters=None, after=None, seed=None, limit=GL_PAGE_SIZE):
+        account_id = int(account_id)
+        # Scope every query (including the opening balance) to the expanded account
+        ledger = self._get_ledger(dict(filters or {}, account_id=account_id))
+        limit = min(int(limit), GL_PAGE_SIZE)
+
+        if after:
+            after = (fields.Date.to_date(after[0]), int(after[1]))
+            seed = float(seed or 0.0)
+        else:
+            # First page: seed the running balance with the opening balance
+            debit, credit = ledger._get_opening_balances().get(account_id, (0.0, 0.0))
+            seed = debit - credit
+
+        page = ledger._get_account_line_page(account_id, seed=seed, after=after, limit=limit)
+        return {
+            'limit': limit,
+            'lines': [{
+                'id': line['id'],
+                'date': fields.Date.to_string(line['date']),
+                'ref': line['ref'] or "",
+                'label': line['label'] or "",
+                'product_group': line['product_group'] or "",
+                'partner': line['partner'] or "",
+                'counter': line['counter'] or "",
+                'debit': line['debit'] or 0.0,
+                'credit': line['credit'] or 0.0,
+                'balance': line['balance'],
+            } for line in page],
+        }
@@ -0,0 +1,57 @@
+from odoo import fields, http
+
+from .ledger_viewer import get_viewer_report
+
+
+class GroupPartyViewerController(http.Controller):
+    """JSON routes behind the ``group_party_viewer`` widget."""
+
+    FILTER_FIELDS = ('date_from', 'date_to', 'partner_id', 'vendor_group', 'company_id', 'consolidate', 'open_items_only')
+
+    def _get_report(self, filters, record_id=None):
+        return get_viewer_report('group.party', self.FILTER_FIELDS, filters, record_id=record_id)
+
+    @http.route('/group_party/viewer/partners', type='json', auth='user')
+    def partners(self, filters=None, record_id=None):
+        # Totals of the saved report's last refresh when still current
+        report = self._get_report(filters, record_id=record_id)
+        report_data, all_totals = report._get_report_totals()
+        return {
+            'partners': [{
+                'id': pdata['partner'].id,
+                'name': pdata['partner'].name or '',
+                'opening_balance': pdata['opening_balance'],
+                'period_total_debit': pdata['period_total_debit'],
+                'period_total_credit': pdata['period_total_credit'],
+                'final_balance': pdata['final_balance'],
+                'companies': [{
+                    'id': crow['company'].id,
+                    'name': crow['company'].sudo().name,
+                    'opening_balance': crow['opening_balance'],
+                    'period_total_debit': crow['period_total_debit'],
+                    'period_total_credit': crow['period_total_credit'],
+                    'final_balance': crow['final_balance'],
+                } for crow in pdata['companies']],
+            } for pdata in report_data],
+            'totals': all_totals,
+            'consolidated': report.consolidate,
+        }
+
+    @http.route('/group_party/viewer/lines', type='json', auth='user')
+    def lines(self, partner_id, filters=None):
+        # Scope the whole report to the expanded partner
+        report = self._get_report(dict(filters or {}, partner_id=int(partner_id)))
+        report_data, _all_totals = report._get_report_data()
+        if not report_data:
+            return {'opening_debit_sum': 0.0, 'opening_credit_sum': 0.0, 'opening_balance': 0.0, 'lines': []}
+        pdata = report_data[0]
+        return {
+            'opening_debit_sum': pdata['opening_debit_sum'],
+            'opening_credit_sum': pdata['opening_credit_sum'],
+            'opening_balance': pdata['opening_balance'],
+            'lines': [dict(
+                line,
+                date=fields.Date.to_string(line['date']),
+                due_date=fields.Date.to_string(line['due_date']) if line['due_date'] else '',
+            ) for line in pdata['lines']],
+        }
@@ -0,0 +1,22 @@
+from odoo.exceptions import AccessError
+from odoo.http import request
+
+
+def get_viewer_report(model_name, filter_fields, filters, record_id=None):
+    """Return a ``model_name`` record holding the ``filter_fields`` values
+    sent by a ledger viewer widget.
+
+    The widgets send the filters currently shown in the form, so unsaved
+    edits are reflected without writing the record. The saved record
+    (``record_id``) becomes the origin of the returned one, which can then
+    reuse what was stored for it. The report queries run as raw SQL: only
+    the user's own companies are allowed.
+    """
+    filters = filters or {}
+    company_id = filters.get('company_id')
+    if company_id and int(company_id) not in request.env.companies.ids:
+        raise AccessError(f"You are not allowed to access the ledger of company {company_id}.")
+    origin = request.env[model_name].browse(int(record_id)).exists() if record_id else None
+    return request.env[model_name].new({
+        field: filters.get(field) or False for field in filter_fields
+    }, origin=origin or None)
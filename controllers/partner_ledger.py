@@ -2,7 +2,6 @@ from odoo import http
 from odoo.http import request
 import io
 import xlsxwriter
-from collections import defaultdict
 
 class PartnerLedgerExportController(http.Controller):
 
@@ -20,76 +19,34 @@ class PartnerLedgerExportController(http.Controller):
         category_format = workbook.add_format({'bold': True, 'bg_color': '#ADD8E6'})
         money_format = workbook.add_format({'num_format': '#,##0'})
 
+        windows = record._get_comparison_windows()
+
         row = 0
+        if len(windows) > 1:
+            # One band of four columns per period, report period first
+            for index, (label, _date_from, _date_to) in enumerate(windows):
+                sheet.merge_range(row, 1 + 4 * index, row, 4 + 4 * index, label, header_format)
+            row += 1
         sheet.write(row, 0, 'Partner', header_format)
-        sheet.write(row, 1, 'Opening Balance', header_format)
-        sheet.write(row, 2, 'Total Debit', header_format)
-        sheet.write(row, 3, 'Total Credit', header_format)
-        sheet.write(row, 4, 'Closing Balance', header_format)
+        for index in range(len(windows)):
+            sheet.write(row, 1 + 4 * index, 'Opening Balance', header_format)
+            sheet.write(row, 2 + 4 * index, 'Total Debit', header_format)
+            sheet.write(row, 3 + 4 * index, 'Total Credit', header_format)
+            sheet.write(row, 4 + 4 * index, 'Closing Balance', header_format)
         row += 1
 
-        # Grouping logic
-        AccountMoveLine = request.env['account.move.line'].sudo()
-
-        base_domain = [('partner_id', '!=', False), ('move_id.state', '=', 'posted')]
-        if record.product_categ_id:
-            base_domain.append(('product_id.categ_id', '=', record.product_categ_id.id))
-        if record.partner_id:
-            base_domain.append(('partner_id', '=', record.partner_id.id))
-        # NEW: restrict all move lines to the selected company
-        if getattr(record, 'company_id', False):
-            base_domain.append(('company_id', '=', record.company_id.id))
-
-        trx_domain = list(base_domain)
-        if record.date_from:
-            trx_domain.append(('date', '>=', record.date_from))
-        if record.date_to:
-            trx_domain.append(('date', '<=', record.date_to))
-
-        # Opening balance only makes sense when there is a start date to
-        # open "from". Without date_from, opening_domain would be identical
-        # to trx_domain and every line would be counted twice (once as
-        # opening, once as debit/credit) - so skip it entirely.
-        if record.date_from:
-            opening_domain = list(base_domain)
-            opening_domain.append(('date', '<', record.date_from))
-            opening_lines = AccountMoveLine.search(opening_domain)
-        else:
-            opening_lines = AccountMoveLine.browse()
-
-        trx_lines = AccountMoveLine.search(trx_domain)
-
-        grouped_data = defaultdict(lambda: defaultdict(lambda: {
-            'opening': 0.0, 'debit': 0.0, 'credit': 0.0
-        }))
-
-        for line in opening_lines:
-            group = line.product_id.categ_id.name if line.product_id and line.product_id.categ_id else "Unknown"
-            partner = line.partner_id.name or "Unknown"
-            grouped_data[group][partner]['opening'] += line.debit - line.credit
-
-        for line in trx_lines:
-            group = line.product_id.categ_id.name if line.product_id and line.product_id.categ_id else "Unknown"
-            partner = line.partner_id.name or "Unknown"
-            grouped_data[group][partner]['debit'] += line.debit
-            grouped_data[group][partner]['credit'] += line.credit
-
-        # Write category once, then its partner rows
-        for category, partners in grouped_data.items():
-            sheet.write(row, 0, category, category_format)
+        # One grouped query per (category, partner), shared with the HTML view
+        for category in record._get_summary_data():
+            sheet.write(row, 0, "    " * category['level'] + category['group'], category_format)
             row += 1
 
-            for partner, values in partners.items():
-                opening = values['opening']
-                debit = values['debit']
-                credit = values['credit']
-                closing = opening + debit - credit
-
-                sheet.write(row, 0, partner)
-                sheet.write_number(row, 1, opening, money_format)
-                sheet.write_number(row, 2, debit, money_format)
-                sheet.write_number(row, 3, credit, money_format)
-                sheet.write_number(row, 4, closing, money_format)
+            for values in category['partners']:
+                sheet.write(row, 0, values['partner'])
+                for index, period in enumerate([values] + values['comparisons']):
+                    sheet.write_number(row, 1 + 4 * index, period['opening'], money_format)
+                    sheet.write_number(row, 2 + 4 * index, period['debit'], money_format)
+                    sheet.write_number(row, 3 + 4 * index, period['credit'], money_format)
+                    sheet.write_number(row, 4 + 4 * index, period['closing'], money_format)
                 row += 1
 
             row += 1  # blank line between categories
@@ -31,107 +31,31 @@ class PartnerLedgerGroupExportController(http.Controller):
             sheet.write(0, col, header, header_bg)
         row = 1
 
-        AccountMoveLine = request.env['account.move.line'].sudo()
-        AccountAccount = request.env['account.account'].sudo()
-
-        # === Build domain (only product lines) ===
-        domain = [
-            ('partner_id', '!=', False),
-            ('move_id.state', '=', 'posted'),
-            ('product_id', '!=', False),
-        ]
-        if record.date_from:
-            domain.append(('date', '>=', record.date_from))
-        if record.date_to:
-            domain.append(('date', '<=', record.date_to))
-        if record.partner_id:
-            domain.append(('partner_id', '=', record.partner_id.id))
-        # NEW: restrict move lines to the selected company
-        if getattr(record, 'company_id', False):
-            domain.append(('company_id', '=', record.company_id.id))
-
-        move_lines = AccountMoveLine.search(domain, order='date, id')
-
-        # === Group by partner ===
-        lines_by_partner = {}
-        for line in move_lines:
-            lines_by_partner.setdefault(line.partner_id, []).append(line)
-
-        for partner, lines in lines_by_partner.items():
+        # === Product lines, collapsed in the database to the selected granularity ===
+        for partner in record._get_partner_overview(limit=None):
             # Partner header row
-            sheet.write(row, 0, partner.name, header_bg)
+            sheet.write(row, 0, partner['name'], header_bg)
             row += 1
 
-            running_balance = 0.0
-
-            for line in lines:
-                move = line.move_id
-                ref = move.ref or move.name or "Unavailable"
-                label = line.name or move.name or "Unavailable"
-                product_group = line.product_id.categ_id.name if line.product_id and line.product_id.categ_id else "Unavailable"
-                product_name = line.product_id.display_name if line.product_id else "Unavailable"
-
-                # === Use actual debit and credit values ===
-                amount_dr = line.debit or 0.0
-                amount_cr = line.credit or 0.0
-
-                account_dr = f"{line.account_id.code} - {line.account_id.name}" if amount_dr > 0 else ""
-                account_cr = f"{line.account_id.code} - {line.account_id.name}" if amount_cr > 0 else ""
-
-                # === Running balance ===
-                running_balance += (amount_dr - amount_cr)
-
-                # Compute unit price
-                unit_price = 0.0
-                if line.quantity:
-                    unit_price = (amount_dr or amount_cr) / line.quantity
-
+            for line in partner['lines']:
                 # Write line
                 sheet.write(row, 0, "")  # Empty partner cell
-                sheet.write(row, 1, str(line.date))
-                sheet.write(row, 2, ref)
-                sheet.write(row, 3, label)
-                sheet.write(row, 4, product_group)
-                sheet.write(row, 5, product_name)
-                sheet.write(row, 6, unit_price, money)
-                sheet.write(row, 7, account_dr)
-                sheet.write(row, 8, account_cr)
-                sheet.write(row, 9, amount_dr, money)
-                sheet.write(row, 10, amount_cr, money)
-                sheet.write(row, 11, running_balance, money)
+                sheet.write(row, 1, str(line['date']))
+                sheet.write(row, 2, line['ref'])
+                sheet.write(row, 3, line['label'])
+                sheet.write(row, 4, line['product_group'])
+                sheet.write(row, 5, line['product'])
+                sheet.write(row, 6, line['unit_price'], money)
+                sheet.write(row, 7, line['account_dr'])
+                sheet.write(row, 8, line['account_cr'])
+                sheet.write(row, 9, line['debit'], money)
+                sheet.write(row, 10, line['credit'], money)
+                sheet.write(row, 11, line['balance'], money)
                 row += 1
 
-            # === Partner summary balance ===
-            account_domain = [
-                ('account_type', 'in', ['asset_receivable', 'liability_payable'])
-            ]
-            # NEW: restrict receivable/payable accounts to the selected company
-            if getattr(record, 'company_id', False):
-                account_domain.append(('company_ids', 'in', record.company_id.id))
-            payable_receivable_accounts = AccountAccount.search(account_domain)
-
-            balance_domain = [
-                ('partner_id', '=', partner.id),
-                ('account_id', 'in', payable_receivable_accounts.ids),
-                ('move_id.state', '=', 'posted'),
-            ]
-            # NEW: restrict the balance calc to the selected company too
-            if getattr(record, 'company_id', False):
-                balance_domain.append(('company_id', '=', record.company_id.id))
-
-            partner_lines = AccountMoveLine.read_group(
-                domain=balance_domain,
-                fields=['debit', 'credit'],
-                groupby=[]
-            )
-            balance = 0.0
-            if partner_lines:
-                totals = partner_lines[0]
-                balance = totals.get('debit', 0.0) - totals.get('credit', 0.0)
-
-            # Summary row
-            sheet.write(row, 0, f"Balance for {partner.name}", bold)
-            sheet.write(row, 11, balance, summary_bg)
+            # Summary row: receivable/payable balance, batched for all partners
+            sheet.write(row, 0, f"Balance for {partner['name']}", bold)
+            sheet.write(row, 11, partner['balance'], summary_bg)
             row += 2  # Blank line
 
         # === Adjust column widths ===
@@ -139,6 +63,26 @@ class PartnerLedgerGroupExportController(http.Controller):
         for i, w in enumerate(widths):
             sheet.set_column(i, i, w)
 
+        # === Unit price statistics per (partner, product) ===
+        stats_sheet = workbook.add_worksheet('Price Statistics')
+        stats_headers = [
+            "Partner", "Product", "Lines", "Quantity", "Min Price",
+            "Max Price", "Weighted Avg. Price", "Last Price",
+        ]
+        for col, header in enumerate(stats_headers):
+            stats_sheet.write(0, col, header, header_bg)
+        for stats_row, values in enumerate(record._get_price_statistics(), start=1):
+            stats_sheet.write(stats_row, 0, values['partner'])
+            stats_sheet.write(stats_row, 1, values['product'])
+            stats_sheet.write(stats_row, 2, values['line_count'])
+            stats_sheet.write(stats_row, 3, values['quantity'], money)
+            stats_sheet.write(stats_row, 4, values['min_price'], money)
+            stats_sheet.write(stats_row, 5, values['max_price'], money)
+            stats_sheet.write(stats_row, 6, values['avg_price'], money)
+            stats_sheet.write(stats_row, 7, values['last_price'], money)
+        for i, w in enumerate([25, 30, 8, 12, 15, 15, 18, 15]):
+            stats_sheet.set_column(i, i, w)
+
         workbook.close()
         output.seek(0)
 
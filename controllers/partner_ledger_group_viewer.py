@@ -0,0 +1,46 @@
+from odoo import fields, http
+
+from ..models.partner_ledger_group import PLG_PAGE_SIZE
+from .ledger_viewer import get_viewer_report
+
+LINE_FIELDS = (
+    'id', 'ref', 'label', 'product_group', 'product', 'unit_price',
+    'account_dr', 'account_cr', 'debit', 'credit', 'balance',
+)
+
+
+def _serialize_line(line):
+    return dict({field: line[field] for field in LINE_FIELDS}, date=fields.Date.to_string(line['date']))
+
+
+class PartnerLedgerGroupViewerController(http.Controller):
+    """JSON routes behind the ``plg_ledger_viewer`` widget."""
+
+    FILTER_FIELDS = ('date_from', 'date_to', 'partner_id', 'company_id', 'granularity')
+
+    def _get_report(self, filters):
+        return get_viewer_report('partner.ledger.group', self.FILTER_FIELDS, filters)
+
+    @http.route('/partner_ledger_group/viewer/partners', type='json', auth='user')
+    def partners(self, filters=None):
+        # Overview only: a partner's lines are paged in when it is expanded
+        report = self._get_report(filters)
+        return {
+            'limit': PLG_PAGE_SIZE,
+            'partners': report._get_partner_overview(with_lines=False),
+        }
+
+    @http.route('/partner_ledger_group/viewer/lines', type='json', auth='user')
+    def lines(self, partner_id, after=None, seed=None, filters=None, limit=PLG_PAGE_SIZE):
+        report = self._get_report(filters)
+        limit = min(int(limit), PLG_PAGE_SIZE)
+        page = report._get_partner_line_page(
+            int(partner_id),
+            seed=float(seed or 0.0),
+            after=(fields.Date.to_date(after[0]), int(after[1])) if after else None,
+            limit=limit,
+        )
+        return {
+            'limit': limit,
+            'lines': [_serialize_line(line) for line in page],
+        }
@@ -4,6 +4,43 @@ import xlsxwriter
 from odoo import http
 from odoo.http import request
 
+from ..models.group import AGING_BUCKETS
+
+
+def write_aging_sheet(workbook, record, report_data):
+    """Add the AR/AP aging buckets of ``report_data``'s partners as a sheet."""
+    sheet = workbook.add_worksheet('Aging')
+    bold = workbook.add_format({'bold': True, 'bg_color': '#F0F0F0'})
+    money = workbook.add_format({'num_format': '#,##0.00'})
+    total_fmt = workbook.add_format({'bold': True, 'bg_color': '#D3D3D3', 'num_format': '#,##0.00'})
+
+    size = len(AGING_BUCKETS)
+    sheet.write(0, 0, f"Aging as of {record.date_to or 'today'} (days past due)", bold)
+    sheet.merge_range(1, 1, 1, size, "Receivable", bold)
+    sheet.merge_range(1, size + 1, 1, 2 * size, "Payable", bold)
+    sheet.write(2, 0, "Partner", bold)
+    for index, (_key, label, _low, _high) in enumerate(AGING_BUCKETS):
+        sheet.write(2, 1 + index, label, bold)
+        sheet.write(2, 1 + size + index, label, bold)
+    sheet.set_column(0, 0, 30)
+    sheet.set_column(1, 2 * size, 14)
+
+    aging = record._get_aging_data()
+    totals = [0.0] * (2 * size)
+    row = 3
+    for pdata in report_data:
+        buckets = aging.get(pdata['partner'].id)
+        amounts = buckets['ar'] + buckets['ap'] if buckets else [0.0] * (2 * size)
+        sheet.write(row, 0, pdata['partner'].name or '')
+        for col, amount in enumerate(amounts, start=1):
+            sheet.write_number(row, col, amount, money)
+            totals[col - 1] += amount
+        row += 1
+
+    sheet.write(row, 0, "TOTAL", bold)
+    for col, amount in enumerate(totals, start=1):
+        sheet.write_number(row, col, amount, total_fmt)
+
 
 class PartnerLedgerXlsxController(http.Controller):
 
@@ -17,6 +54,7 @@ class PartnerLedgerXlsxController(http.Controller):
             return request.not_found()
 
         # Fetch data using group.py's centralized method
+        record._refresh_snapshot()
         report_data, all_totals = record._get_report_data()
 
         output = io.BytesIO()
@@ -32,13 +70,17 @@ class PartnerLedgerXlsxController(http.Controller):
         total_fmt = workbook.add_format({'bold': True, 'bg_color': '#D3D3D3', 'num_format': '#,##0.00'})
 
         row = 0
+        # Consolidated runs get a trailing Company column on the lines
+        last_col = 8 if record.consolidate else 7
 
         date_from_str = str(record.date_from) if record.date_from else ""
         date_to_str = str(record.date_to) if record.date_to else ""
-        sheet.merge_range(row, 0, row, 7, f"Company: {all_totals['company_name']} | Date Range: {date_from_str or '...'} to {date_to_str or '...'}", header)
+        sheet.merge_range(row, 0, row, last_col, f"Company: {all_totals['company_name']} | Date Range: {date_from_str or '...'} to {date_to_str or '...'}", header)
         row += 2
 
         cols = ["Date", "Journal", "Account", "Reference", "Due Date", "Debit", "Credit", "Balance"]
+        if record.consolidate:
+            cols.append("Company")
         for idx, col_name in enumerate(cols):
             sheet.write(row, idx, col_name, bold)
         row += 1
@@ -47,7 +89,7 @@ class PartnerLedgerXlsxController(http.Controller):
             partner = pdata['partner']
 
             # Partner Block Header
-            sheet.merge_range(row, 0, row, 7, partner.name or '', partner_header)
+            sheet.merge_range(row, 0, row, last_col, partner.name or '', partner_header)
             row += 1
 
             # Initial Balance Row
@@ -67,8 +109,19 @@ class PartnerLedgerXlsxController(http.Controller):
                 sheet.write_number(row, 5, line['debit'], money)
                 sheet.write_number(row, 6, line['credit'], money)
                 sheet.write_number(row, 7, line['balance'], money)
+                if record.consolidate:
+                    sheet.write(row, 8, line['company'])
                 row += 1
 
+            # Per-company subtotals of a consolidated run
+            if record.consolidate:
+                for crow in pdata['companies']:
+                    sheet.write(row, 3, crow['company'].sudo().name or '', sub_bold)
+                    sheet.write_number(row, 5, crow['period_total_debit'], money)
+                    sheet.write_number(row, 6, crow['period_total_credit'], money)
+                    sheet.write_number(row, 7, crow['final_balance'], money)
+                    row += 1
+
             # Subtotal Row
             sheet.write(row, 3, f"Total {partner.name or ''}", sub_bold)
             sheet.write_number(row, 5, pdata['period_total_debit'], total_fmt)
@@ -82,6 +135,9 @@ class PartnerLedgerXlsxController(http.Controller):
         sheet.write_number(row, 6, all_totals['credit'], total_fmt)
         sheet.write_number(row, 7, all_totals['balance'], total_fmt)
 
+        if record.show_aging:
+            write_aging_sheet(workbook, record, report_data)
+
         workbook.close()
         output.seek(0)
         return request.make_response(
@@ -104,7 +160,9 @@ class PartnerLedgerXlsxController(http.Controller):
         if not record.exists():
             return request.not_found()
 
-        report_data, all_totals = record._get_report_data()
+        # Totals only: persisted period totals, no per-line data
+        record._refresh_snapshot()
+        report_data, all_totals = record._get_report_totals()
 
         output = io.BytesIO()
         workbook = xlsxwriter.Workbook(output, {'in_memory': True})
@@ -114,6 +172,8 @@ class PartnerLedgerXlsxController(http.Controller):
         money = workbook.add_format({'num_format': '#,##0.00'})
         header = workbook.add_format({'bold': True, 'font_size': 12})
         total_fmt = workbook.add_format({'bold': True, 'bg_color': '#D3D3D3', 'num_format': '#,##0.00'})
+        company_fmt = workbook.add_format({'italic': True, 'font_color': '#555555'})
+        company_money = workbook.add_format({'italic': True, 'font_color': '#555555', 'num_format': '#,##0.00'})
 
         row = 0
 
@@ -138,6 +198,16 @@ class PartnerLedgerXlsxController(http.Controller):
             sheet.write_number(row, 4, pdata['final_balance'], money)
             row += 1
 
+            # Per-company breakdown of a consolidated run
+            if record.consolidate:
+                for crow in pdata['companies']:
+                    sheet.write(row, 0, f"    {crow['company'].sudo().name or ''}", company_fmt)
+                    sheet.write_number(row, 1, crow['opening_balance'], company_money)
+                    sheet.write_number(row, 2, crow['period_total_debit'], company_money)
+                    sheet.write_number(row, 3, crow['period_total_credit'], company_money)
+                    sheet.write_number(row, 4, crow['final_balance'], company_money)
+                    row += 1
+
         # Grand Totals Row
         sheet.write(row, 0, "TOTAL", bold)
         sheet.write_number(row, 1, all_totals['opening'], total_fmt)
@@ -145,6 +215,9 @@ class PartnerLedgerXlsxController(http.Controller):
         sheet.write_number(row, 3, all_totals['credit'], total_fmt)
         sheet.write_number(row, 4, all_totals['balance'], total_fmt)
 
+        if record.show_aging:
+            write_aging_sheet(workbook, record, report_data)
+
         workbook.close()
         output.seek(0)
 
@@ -2,11 +2,18 @@
 
 from . import models
 from . import general_ledger
+from . import account_move_line
+from . import account_move
+from . import account_daily_balance
+from . import account_locked_balance
+from . import res_company
 from . import stock
 from . import product_product
+from . import product_template
 from . import partner_ledger
 from . import partner_ledger_group
 from . import group
+from . import group_party_balance
 from . import res_partner
 from . import beta
 from . import party_stock_summary
@@ -0,0 +1,175 @@
+from odoo import api, fields, models
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+
+class AccountDailyBalance(models.Model):
+    _name = 'account.daily.balance'
+    _description = "Daily Account Balance Snapshot"
+    _log_access = False
+    _order = 'date, id'
+
+    # Rows are only written through SQL by _apply_lines() and _rebuild().
+    # They follow the posted state of entries (account.move.write), edits
+    # and deletion of posted items (account.move.line.write/unlink) and
+    # product category changes (product.template.write). Anything bypassing
+    # the ORM (raw SQL, data imports in SQL) requires running _rebuild().
+    company_id = fields.Many2one('res.company', string="Company", required=True, readonly=True)
+    account_id = fields.Many2one('account.account', string="Account", required=True, readonly=True)
+    partner_id = fields.Many2one('res.partner', string="Partner", readonly=True)
+    # Lets partner.ledger split opening balances per product category
+    product_categ_id = fields.Many2one('product.category', string="Product Category", readonly=True)
+    date = fields.Date(string="Date", required=True, readonly=True)
+    currency_id = fields.Many2one(related='company_id.currency_id')
+    debit = fields.Monetary(string="Debit", readonly=True)
+    credit = fields.Monetary(string="Credit", readonly=True)
+
+    def init(self):
+        super().init()
+        self.env.cr.execute(SQL(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS account_daily_balance_key_uniq
+                ON account_daily_balance (
+                    company_id, account_id, COALESCE(partner_id, 0),
+                    COALESCE(product_categ_id, 0), date
+                )
+            """
+        ))
+        create_index(self.env.cr, 'account_daily_balance_company_date_idx', self._table, ['company_id', 'date'])
+
+    # --------------------------------------------
+    # Maintenance
+    # --------------------------------------------
+    @api.model
+    def _aggregate_lines_sql(self, condition, sign=1):
+        """Daily sums of the journal items matching ``condition``, upserted into the table."""
+        return SQL(
+            """
+            INSERT INTO account_daily_balance
+                   (company_id, account_id, partner_id, product_categ_id, date, debit, credit)
+            SELECT aml.company_id, aml.account_id, aml.partner_id, pt.categ_id, aml.date,
+                   %(sign)s * SUM(aml.debit), %(sign)s * SUM(aml.credit)
+              FROM account_move_line aml
+         LEFT JOIN product_product pp ON pp.id = aml.product_id
+         LEFT JOIN product_template pt ON pt.id = pp.product_tmpl_id
+             WHERE aml.account_id IS NOT NULL
+               AND %(condition)s
+          GROUP BY aml.company_id, aml.account_id, aml.partner_id, pt.categ_id, aml.date
+                ON CONFLICT (company_id, account_id, COALESCE(partner_id, 0),
+                             COALESCE(product_categ_id, 0), date)
+         DO UPDATE SET debit = account_daily_balance.debit + EXCLUDED.debit,
+                       credit = account_daily_balance.credit + EXCLUDED.credit
+            """,
+            sign=sign,
+            condition=condition,
+        )
+
+    @api.model
+    def _apply_lines(self, lines, sign, invalidate_locked_from_date=True):
+        """Add (``sign=1``) or remove (``sign=-1``) the journal items ``lines``.
+
+        The frozen balances of ``account.locked.balance`` taken on or after
+        the earliest line date are dropped (all of the company's when
+        ``invalidate_locked_from_date`` is False).
+        """
+        if not lines:
+            return
+        self.env['account.move.line'].flush_model(['company_id', 'account_id', 'partner_id', 'product_id', 'date', 'debit', 'credit'])
+        self.env['product.template'].flush_model(['categ_id'])
+        self.env.cr.execute(self._aggregate_lines_sql(SQL("aml.id = ANY(%s)", lines.ids), sign))
+        self.invalidate_model()
+
+        # Safety net for entries changed inside a locked period (e.g. through
+        # a lock date exception): the frozen balances after them are stale.
+        LockedBalance = self.env['account.locked.balance'].sudo()
+        for company in lines.company_id:
+            from_date = invalidate_locked_from_date and min(lines.filtered(lambda l: l.company_id == company).mapped('date'))
+            LockedBalance._invalidate(company, from_date or None)
+
+    @api.model
+    def _apply_moves(self, moves, sign):
+        """Add (``sign=1``) or remove (``sign=-1``) the lines of ``moves``."""
+        self._apply_lines(moves.sudo().line_ids, sign)
+
+    @api.model
+    def _rebuild(self):
+        """Recompute the whole table from the posted journal items.
+
+        Run it after installing the module, after journal items were changed
+        outside the ORM, or from a shell:
+        ``env['account.daily.balance']._rebuild()``.
+        """
+        self.env['account.move.line'].flush_model()
+        self.env.cr.execute(SQL("TRUNCATE account_daily_balance, account_locked_balance"))
+        self.env.cr.execute(self._aggregate_lines_sql(SQL("aml.parent_state = 'posted'")))
+        self.invalidate_model()
+        return True
+
+    # --------------------------------------------
+    # Readers
+    # --------------------------------------------
+    @api.model
+    def _get_history_sql(self, date_to_exclusive, company_ids=None):
+        """Subquery of the posted balance history strictly before ``date_to_exclusive``.
+
+        Columns: company_id, account_id, partner_id, product_categ_id, debit,
+        credit. Reports alias it and group it the way they need to get
+        opening balances with a range sum instead of reading journal items.
+
+        For companies whose lock date falls before ``date_to_exclusive``, the
+        locked part of the history comes from the frozen
+        ``account.locked.balance`` snapshot and only the unlocked tail is
+        read from the daily balances.
+        """
+        Company = self.env['res.company'].sudo()
+        companies = Company.browse(company_ids) if company_ids else Company.search([])
+        LockedBalance = self.env['account.locked.balance'].sudo()
+
+        parts = []
+        unlocked_company_ids = []
+        for company in companies:
+            lock_date = company._get_balance_lock_date()
+            if not lock_date or lock_date >= date_to_exclusive:
+                unlocked_company_ids.append(company.id)
+                continue
+            LockedBalance._ensure_snapshot(company, lock_date)
+            parts.append(SQL(
+                """
+                SELECT lbal.company_id, lbal.account_id, lbal.partner_id,
+                       lbal.product_categ_id, lbal.debit, lbal.credit
+                  FROM account_locked_balance lbal
+                 WHERE lbal.company_id = %(company_id)s
+                   AND lbal.lock_date = %(lock_date)s
+             UNION ALL
+                SELECT dbal.company_id, dbal.account_id, dbal.partner_id,
+                       dbal.product_categ_id, dbal.debit, dbal.credit
+                  FROM account_daily_balance dbal
+                 WHERE dbal.company_id = %(company_id)s
+                   AND dbal.date > %(lock_date)s
+                   AND dbal.date < %(date_to)s
+                """,
+                company_id=company.id,
+                lock_date=lock_date,
+                date_to=date_to_exclusive,
+            ))
+        if unlocked_company_ids:
+            parts.append(SQL(
+                """
+                SELECT dbal.company_id, dbal.account_id, dbal.partner_id,
+                       dbal.product_categ_id, dbal.debit, dbal.credit
+                  FROM account_daily_balance dbal
+                 WHERE dbal.company_id = ANY(%s)
+                   AND dbal.date < %s
+                """,
+                unlocked_company_ids,
+                date_to_exclusive,
+            ))
+        if not parts:
+            return SQL(
+                """
+                (SELECT NULL::int AS company_id, NULL::int AS account_id, NULL::int AS partner_id,
+                        NULL::int AS product_categ_id, 0::numeric AS debit, 0::numeric AS credit
+                  WHERE FALSE)
+                """
+            )
+        return SQL("(%s)", SQL(" UNION ALL ").join(parts))
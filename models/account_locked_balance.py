@@ -0,0 +1,72 @@
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+
+class AccountLockedBalance(models.Model):
+    _name = 'account.locked.balance'
+    _description = "Frozen Closing Balance at Lock Date"
+    _log_access = False
+    _order = 'lock_date desc, id'
+
+    # Closing balance of every (account, partner, product category) as of
+    # lock_date. Filled on first use by _ensure_snapshot(), never updated.
+    company_id = fields.Many2one('res.company', string="Company", required=True, readonly=True)
+    lock_date = fields.Date(string="Lock Date", required=True, readonly=True)
+    account_id = fields.Many2one('account.account', string="Account", required=True, readonly=True)
+    partner_id = fields.Many2one('res.partner', string="Partner", readonly=True)
+    product_categ_id = fields.Many2one('product.category', string="Product Category", readonly=True)
+    currency_id = fields.Many2one(related='company_id.currency_id')
+    debit = fields.Monetary(string="Debit", readonly=True)
+    credit = fields.Monetary(string="Credit", readonly=True)
+
+    def init(self):
+        super().init()
+        self.env.cr.execute(SQL(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS account_locked_balance_key_uniq
+                ON account_locked_balance (
+                    company_id, lock_date, account_id, COALESCE(partner_id, 0),
+                    COALESCE(product_categ_id, 0)
+                )
+            """
+        ))
+
+    @api.model
+    def _ensure_snapshot(self, company, lock_date):
+        """Freeze the closing balances of ``company`` at ``lock_date`` unless already done."""
+        self.env.cr.execute(SQL(
+            "SELECT 1 FROM account_locked_balance WHERE company_id = %s AND lock_date = %s LIMIT 1",
+            company.id, lock_date,
+        ))
+        if self.env.cr.fetchone():
+            return
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO account_locked_balance
+                   (company_id, lock_date, account_id, partner_id, product_categ_id, debit, credit)
+            SELECT dbal.company_id, %(lock_date)s, dbal.account_id, dbal.partner_id,
+                   dbal.product_categ_id, SUM(dbal.debit), SUM(dbal.credit)
+              FROM account_daily_balance dbal
+             WHERE dbal.company_id = %(company_id)s
+               AND dbal.date <= %(lock_date)s
+          GROUP BY dbal.company_id, dbal.account_id, dbal.partner_id, dbal.product_categ_id
+            HAVING SUM(dbal.debit) != 0 OR SUM(dbal.credit) != 0
+                ON CONFLICT DO NOTHING
+            """,
+            company_id=company.id,
+            lock_date=lock_date,
+        ))
+
+    @api.model
+    def _invalidate(self, company, from_date=None):
+        """Drop the snapshots of ``company`` taken on or after ``from_date`` (all if not set)."""
+        if from_date:
+            self.env.cr.execute(SQL(
+                "DELETE FROM account_locked_balance WHERE company_id = %s AND lock_date >= %s",
+                company.id, from_date,
+            ))
+        else:
+            self.env.cr.execute(SQL(
+                "DELETE FROM account_locked_balance WHERE company_id = %s", company.id,
+            ))
+        self.invalidate_model()
@@ -0,0 +1,26 @@
+from odoo import models
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    # Keep account.daily.balance in step with the posted state of entries.
+    # Hooked on the state write itself so every transition (post, reset to
+    # draft, cancel, which resets posted entries to draft first) updates the
+    # table exactly once.
+
+    def write(self, vals):
+        if 'state' not in vals:
+            return super().write(vals)
+        DailyBalance = self.env['account.daily.balance']
+        # The entries are applied as a whole here: item writes done while
+        # the state changes must not be applied again by the line hooks
+        moves = self.with_context(daily_balance_move_sync=True)
+        if vals['state'] != 'posted':
+            # Leaving the posted state: remove the items as they were posted
+            DailyBalance._apply_moves(self.filtered(lambda m: m.state == 'posted'), -1)
+            return super(AccountMove, moves).write(vals)
+        to_post = self.filtered(lambda m: m.state != 'posted')
+        res = super(AccountMove, moves).write(vals)
+        DailyBalance._apply_moves(to_post, 1)
+        return res
@@ -0,0 +1,146 @@
+from collections import defaultdict
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+from odoo.tools.sql import column_exists, create_column, create_index
+
+
+class AccountMoveLine(models.Model):
+    _inherit = 'account.move.line'
+
+    gl_counter_accounts = fields.Char(
+        string="Counter Accounts",
+        compute='_compute_gl_counter_accounts',
+        store=True,
+        help="Accounts of the other lines of the same posted entry, "
+             "precomputed so the ledger reports can read them in bulk.",
+    )
+
+    # --------------------------------------------
+    # account.daily.balance maintenance
+    # --------------------------------------------
+    # Fields of a posted item the daily balances are aggregated on
+    DAILY_BALANCE_FIELDS = {'company_id', 'account_id', 'partner_id', 'product_id', 'date', 'debit', 'credit', 'balance'}
+
+    def write(self, vals):
+        posted = self.browse()
+        if self.DAILY_BALANCE_FIELDS.intersection(vals) and not self.env.context.get('daily_balance_move_sync'):
+            posted = self.filtered(lambda l: l.parent_state == 'posted')
+        DailyBalance = self.env['account.daily.balance']
+        DailyBalance._apply_lines(posted, -1)
+        res = super().write(vals)
+        DailyBalance._apply_lines(posted, 1)
+        return res
+
+    def unlink(self):
+        # Posted items only go away with force_delete; take them out first
+        if not self.env.context.get('daily_balance_move_sync'):
+            self.env['account.daily.balance']._apply_lines(self.filtered(lambda l: l.parent_state == 'posted'), -1)
+        return super().unlink()
+
+    def _auto_init(self):
+        # Create the column beforehand so installing the module does not
+        # compute it in Python over every journal item: it is filled with a
+        # single UPDATE by _fill_gl_counter_accounts() in the post-init hook
+        if not column_exists(self.env.cr, self._table, 'gl_counter_accounts'):
+            create_column(self.env.cr, self._table, 'gl_counter_accounts', 'varchar')
+        return super()._auto_init()
+
+    def init(self):
+        super().init()
+        # Keyset pagination of the General Ledger walks one account by (date, id)
+        create_index(
+            self.env.cr,
+            'account_move_line_gl_keyset_idx',
+            self._table,
+            ['account_id', 'date', 'id'],
+            where="parent_state = 'posted'",
+        )
+        # partner.ledger.group pages the product lines of one partner by (date, id)
+        create_index(
+            self.env.cr,
+            'account_move_line_plg_keyset_idx',
+            self._table,
+            ['partner_id', 'date', 'id'],
+            where="parent_state = 'posted' AND product_id IS NOT NULL",
+        )
+        # group.party discovers its partners from the period's posted lines
+        create_index(
+            self.env.cr,
+            'account_move_line_party_activity_idx',
+            self._table,
+            ['company_id', 'date', 'partner_id'],
+            where="parent_state = 'posted' AND partner_id IS NOT NULL",
+        )
+        # Open-items mode of group.party only reads what is left to settle
+        create_index(
+            self.env.cr,
+            'account_move_line_party_open_idx',
+            self._table,
+            ['company_id', 'partner_id', 'date'],
+            where="parent_state = 'posted' AND reconciled IS NOT TRUE AND amount_residual != 0",
+        )
+        # group.party refreshes only the entries written since its watermark
+        create_index(self.env.cr, 'account_move_line_write_date_idx', self._table, ['write_date'])
+
+    @api.depends(
+        'move_id.state',
+        'move_id.line_ids.account_id',
+        'move_id.line_ids.account_id.code',
+        'move_id.line_ids.account_id.name',
+    )
+    def _compute_gl_counter_accounts(self):
+        posted_lines = self.filtered(lambda l: l.parent_state == 'posted')
+        (self - posted_lines).gl_counter_accounts = False
+
+        lines_by_move = defaultdict(lambda: self.browse())
+        for line in posted_lines:
+            lines_by_move[line.move_id] |= line
+
+        for move, lines in lines_by_move.items():
+            # Resolve codes in the move's company, bypassing cross-company rules
+            move_accounts = move.sudo().line_ids.account_id.with_company(move.company_id)
+            labels = {account.id: f"{account.code} - {account.name}" for account in move_accounts}
+            for line in lines:
+                line.gl_counter_accounts = ", ".join(sorted(
+                    label for account_id, label in labels.items()
+                    if account_id != line.account_id.id
+                )) or False
+
+    @api.model
+    def _fill_gl_counter_accounts(self):
+        """Set-based equivalent of ``_compute_gl_counter_accounts`` for all
+        posted journal items, run once at install."""
+        self.flush_model()
+        self.env['account.account'].flush_model()
+        lang = self.env.lang or 'en_US'
+        self.env.cr.execute(SQL(
+            """
+            WITH labels AS (
+                SELECT DISTINCT other.move_id, other.account_id,
+                       CONCAT(
+                           acc.code_store->>split_part(company.parent_path, '/', 1),
+                           ' - ',
+                           COALESCE(acc.name->>%(lang)s, acc.name->>'en_US')
+                       ) AS label
+                  FROM account_move_line other
+                  JOIN res_company company ON company.id = other.company_id
+                  JOIN account_account acc ON acc.id = other.account_id
+                 WHERE other.parent_state = 'posted'
+            )
+            UPDATE account_move_line aml
+               SET gl_counter_accounts = counter.accounts
+              FROM (
+                    SELECT line.id,
+                           STRING_AGG(labels.label, ', ' ORDER BY labels.label COLLATE "C") AS accounts
+                      FROM account_move_line line
+                      JOIN labels ON labels.move_id = line.move_id
+                                 AND labels.account_id != line.account_id
+                     WHERE line.parent_state = 'posted'
+                  GROUP BY line.id
+                   ) AS counter
+             WHERE counter.id = aml.id
+            """,
+            lang=lang,
+        ))
+        self.invalidate_model(['gl_counter_accounts'])
@@ -1,4 +1,35 @@
+import base64
+import logging
+from collections import defaultdict
+
 from odoo import api, fields, models
+from odoo.tools import SQL
+
+from monstar_gl_export import prepare_line
+
+_logger = logging.getLogger(__name__)
+
+# Lines fetched per keyset page when streaming a single account
+GL_PAGE_SIZE = 2000
+
+GL_LINE_COLUMNS = SQL("""
+    aml.id, aml.account_id, aml.date, aml.name, aml.move_name, aml.ref,
+    pc.name AS product_group, partner.name AS partner,
+    aml.gl_counter_accounts AS counter, aml.debit, aml.credit
+""")
+
+GL_LINE_JOINS = SQL("""
+    LEFT JOIN res_partner partner ON partner.id = aml.partner_id
+    LEFT JOIN product_product pp ON pp.id = aml.product_id
+    LEFT JOIN product_template pt ON pt.id = pp.product_tmpl_id
+    LEFT JOIN product_category pc ON pc.id = pt.categ_id
+""")
+
+# Flat row layout of the CSV / NDJSON exports
+GL_EXPORT_COLUMNS = (
+    'account', 'date', 'ref', 'label', 'product_group', 'partner',
+    'counter_account', 'debit', 'credit', 'balance',
+)
 
 
 class GeneralLedger(models.Model):
@@ -15,29 +46,403 @@ class GeneralLedger(models.Model):
         default=lambda self: self.env.company,
     )
 
+    report_mode = fields.Selection(
+        [('detail', "Detailed Lines"), ('summary', "Trial Balance")],
+        string="Report Mode",
+        default='detail',
+        required=True,
+    )
+    summary_by_month = fields.Boolean(
+        string="Columns by Month",
+        help="In Trial Balance mode, add the net movement of every month as a column.",
+    )
+
     journal_items = fields.Html(
         string="Journal Entry Breakdown by Account",
         compute="_compute_journal_breakdowns",
         store=False,
+        help="Rendered as a single HTML document, so it holds every line of "
+             "the period in memory even when filtered on one account. Use "
+             "the XLSX, CSV or NDJSON exports (streamed by keyset pages) or "
+             "the ledger viewer for large ledgers.",
+    )
+    trial_balance = fields.Html(
+        string="Trial Balance",
+        compute="_compute_trial_balance",
+        store=False,
     )
 
-    @api.depends('date_from', 'date_to', 'account_id', 'partner_id', 'company_id')
-    def _compute_journal_breakdowns(self):
-        # Bypasses security restrictions across multi-company records safely
-        AccountMoveLine = self.env['account.move.line'].sudo()
-        Account = self.env['account.account'].sudo()
+    # Sharded XLSX export, run in the background by a cron job
+    parallel_export_archive = fields.Boolean(
+        string="ZIP of Workbooks",
+        help="Produce one workbook per account range, built by the export "
+             "workers themselves, instead of a single merged workbook.",
+    )
+    parallel_export_state = fields.Selection(
+        [('queued', "Queued"), ('done', "Done"), ('failed', "Failed")],
+        string="Parallel Export",
+        readonly=True,
+        copy=False,
+    )
+    parallel_export_file = fields.Binary(string="Parallel Export File", attachment=True, readonly=True, copy=False)
+    parallel_export_filename = fields.Char(readonly=True, copy=False)
+
+    # --------------------------------------------
+    # Centralized Data Fetcher (Used by HTML & Excel)
+    # --------------------------------------------
+    def _get_filter_conditions(self, alias):
+        """Account/partner/company filters on any table aliased ``alias``."""
+        self.ensure_one()
+        conditions = []
+        if self.account_id:
+            conditions.append(SQL("%s = %s", SQL.identifier(alias, 'account_id'), self.account_id.id))
+        if self.partner_id:
+            conditions.append(SQL("%s = %s", SQL.identifier(alias, 'partner_id'), self.partner_id.id))
+        if self.company_id:
+            conditions.append(SQL("%s = %s", SQL.identifier(alias, 'company_id'), self.company_id.id))
+        return conditions
+
+    def _get_line_conditions(self):
+        """Filters on ``account_move_line aml`` shared by every GL query."""
+        return [SQL("aml.parent_state = 'posted'")] + self._get_filter_conditions('aml')
+
+    def _get_period_conditions(self):
+        conditions = self._get_line_conditions()
+        if self.date_from:
+            conditions.append(SQL("aml.date >= %s", self.date_from))
+        if self.date_to:
+            conditions.append(SQL("aml.date <= %s", self.date_to))
+        return conditions
+
+    def _get_opening_balances(self):
+        """Return ``{account_id: (debit, credit)}`` for all history before ``date_from``.
+
+        Read from the ``account.daily.balance`` snapshots with a range sum
+        rather than from the journal items themselves.
+        """
+        self.ensure_one()
+        if not self.date_from:
+            return {}
+        history = self.env['account.daily.balance']._get_history_sql(
+            self.date_from, self.company_id.ids,
+        )
+        conditions = self._get_filter_conditions('hist') or [SQL("TRUE")]
+        self.env.cr.execute(SQL(
+            """
+            SELECT hist.account_id, SUM(hist.debit), SUM(hist.credit)
+              FROM %s AS hist
+             WHERE %s
+          GROUP BY hist.account_id
+            HAVING SUM(hist.debit) != 0 OR SUM(hist.credit) != 0
+            """,
+            history,
+            SQL(" AND ").join(conditions),
+        ))
+        return {
+            account_id: (debit or 0.0, credit or 0.0)
+            for account_id, debit, credit in self.env.cr.fetchall()
+        }
 
-        for rec in self:
-            account_domain = [('id', '=', rec.account_id.id)] if rec.account_id else []
-            if rec.company_id:
-                account_domain.append(('company_ids', 'in', rec.company_id.id))
-
-            accounts = (
-                Account.search(account_domain, order='code')
-                if account_domain
-                else Account.search([], order='code')
+    def _get_period_totals(self):
+        """Return ``{account_id: (debit, credit, line_count)}`` for the lines inside the period."""
+        self.ensure_one()
+        self.env.cr.execute(SQL(
+            """
+            SELECT aml.account_id, SUM(aml.debit), SUM(aml.credit), COUNT(*)
+              FROM account_move_line aml
+             WHERE %s
+          GROUP BY aml.account_id
+            """,
+            SQL(" AND ").join(self._get_period_conditions()),
+        ))
+        return {
+            account_id: (debit or 0.0, credit or 0.0, line_count)
+            for account_id, debit, credit, line_count in self.env.cr.fetchall()
+        }
+
+    def _get_period_lines_sql(self, opening, account_ids=None):
+        """Query of the period lines, ordered by date, id.
+
+        ``balance`` is the running balance of the line's account, computed by
+        the database and seeded with the account's opening balance taken
+        from ``opening`` (``{account_id: (debit, credit)}``). ``account_ids``
+        restricts the query to a subset of accounts (one export shard).
+        """
+        self.ensure_one()
+        conditions = self._get_period_conditions()
+        if account_ids is not None:
+            conditions.append(SQL("aml.account_id = ANY(%s)", list(account_ids)))
+        return SQL(
+            """
+            SELECT %s,
+                   COALESCE(seed.balance, 0) + SUM(aml.debit - aml.credit) OVER (
+                       PARTITION BY aml.account_id ORDER BY aml.date, aml.id
+                       ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+                   ) AS balance
+              FROM account_move_line aml
+         LEFT JOIN unnest(%s::int[], %s::numeric[]) AS seed(account_id, balance)
+                ON seed.account_id = aml.account_id
+                %s
+             WHERE %s
+          ORDER BY aml.date, aml.id
+            """,
+            GL_LINE_COLUMNS,
+            list(opening),
+            [debit - credit for debit, credit in opening.values()],
+            GL_LINE_JOINS,
+            SQL(" AND ").join(conditions),
+        )
+
+    def _get_period_lines(self, opening):
+        """Return the period lines of every account (see ``_get_period_lines_sql``)."""
+        self.env.cr.execute(self._get_period_lines_sql(opening))
+        return self.env.cr.dictfetchall()
+
+    def _get_account_line_page(self, account_id, seed=0.0, after=None, limit=GL_PAGE_SIZE):
+        """Return one page of period lines of a single account.
+
+        Pages are keyed on ``(date, id)``: ``after`` is the key of the last
+        line of the previous page and ``seed`` its running balance, so the
+        database carries the running balance across pages without ever
+        reading the lines before the cursor again.
+        """
+        self.ensure_one()
+        conditions = self._get_period_conditions() + [SQL("aml.account_id = %s", account_id)]
+        if after:
+            conditions.append(SQL("(aml.date, aml.id) > (%s, %s)", *after))
+        self.env.cr.execute(SQL(
+            """
+            SELECT %s,
+                   %s::numeric + SUM(aml.debit - aml.credit) OVER (
+                       ORDER BY aml.date, aml.id
+                       ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+                   ) AS balance
+              FROM account_move_line aml
+                %s
+             WHERE %s
+          ORDER BY aml.date, aml.id
+             LIMIT %s
+            """,
+            GL_LINE_COLUMNS,
+            seed,
+            GL_LINE_JOINS,
+            SQL(" AND ").join(conditions),
+            limit,
+        ))
+        return [prepare_line(line) for line in self.env.cr.dictfetchall()]
+
+    def _iter_account_line_pages(self, account_id, seed=0.0, limit=GL_PAGE_SIZE):
+        """Stream the period lines of one account page by page."""
+        after = None
+        while True:
+            page = self._get_account_line_page(account_id, seed=seed, after=after, limit=limit)
+            if page:
+                yield page
+            if len(page) < limit:
+                return
+            after = (page[-1]['date'], page[-1]['id'])
+            seed = page[-1]['balance']
+
+    def _iter_account_lines(self, account_id, seed=0.0):
+        for page in self._iter_account_line_pages(account_id, seed=seed):
+            yield from page
+
+    def _iter_export_pages(self):
+        """Stream the detailed ledger as pages of flat rows (``GL_EXPORT_COLUMNS``).
+
+        Accounts are walked in code order and each one is read with keyset
+        pages, so at most one page of lines is held in memory at a time.
+        """
+        self.ensure_one()
+        for account_data in self._get_ledger_accounts():
+            if not account_data['line_count']:
+                continue
+            for page in self._iter_account_line_pages(
+                account_data['account'].id, seed=account_data['opening_balance'],
+            ):
+                yield [{
+                    'account': account_data['label'],
+                    'date': fields.Date.to_string(line['date']),
+                    'ref': line['ref'] or "",
+                    'label': line['label'] or "",
+                    'product_group': line['product_group'] or "",
+                    'partner': line['partner'] or "",
+                    'counter_account': line['counter'] or "",
+                    'debit': line['debit'] or 0.0,
+                    'credit': line['credit'] or 0.0,
+                    'balance': line['balance'],
+                } for line in page]
+
+    def _get_ledger_accounts(self):
+        """Return the header of every account that has activity (opening or
+        period lines), ordered by account code: opening, period totals,
+        closing balance and number of period lines. Lines are not read.
+        """
+        self.ensure_one()
+        Account = self.env['account.account'].sudo().with_company(self.company_id or self.env.company)
+
+        opening = self._get_opening_balances()
+        totals = self._get_period_totals()
+
+        account_ids = set(opening) | set(totals)
+        accounts = Account.search([('id', 'in', list(account_ids))], order='code') if account_ids else Account
+
+        ledger = []
+        for account in accounts:
+            opening_debit, opening_credit = opening.get(account.id, (0.0, 0.0))
+            period_debit, period_credit, line_count = totals.get(account.id, (0.0, 0.0, 0))
+            opening_balance = opening_debit - opening_credit
+            ledger.append({
+                'account': account,
+                'label': f"{account.code} - {account.name}",
+                'opening_debit': opening_debit,
+                'opening_credit': opening_credit,
+                'opening_balance': opening_balance,
+                'period_debit': period_debit,
+                'period_credit': period_credit,
+                'closing_balance': opening_balance + period_debit - period_credit,
+                'line_count': line_count,
+            })
+        return ledger
+
+    def _get_ledger_data(self):
+        """Set-based GL engine.
+
+        Returns the account headers of ``_get_ledger_accounts`` with their
+        period lines under ``lines``. The counter accounts come precomputed
+        from ``account.move.line.gl_counter_accounts``, so the number of
+        queries does not depend on the size of the chart of accounts.
+
+        When the ledger is filtered on one account, ``lines`` is a generator
+        streaming keyset pages (see ``_get_account_line_page``) so reading
+        stays flat however large the account is. Only the exports keep it
+        flat end to end: the ``journal_items`` HTML still accumulates the
+        whole rendered ledger.
+        """
+        self.ensure_one()
+        ledger = self._get_ledger_accounts()
+
+        if self.account_id:
+            for account_data in ledger:
+                account_data['lines'] = self._iter_account_lines(
+                    account_data['account'].id, seed=account_data['opening_balance'],
+                )
+            return ledger
+
+        opening = {
+            account_data['account'].id: (account_data['opening_debit'], account_data['opening_credit'])
+            for account_data in ledger
+        }
+        lines_by_account = defaultdict(list)
+        for line in self._get_period_lines(opening):
+            lines_by_account[line['account_id']].append(prepare_line(line))
+        for account_data in ledger:
+            account_data['lines'] = lines_by_account[account_data['account'].id]
+        return ledger
+
+    def _get_summary_data(self):
+        """Trial balance: opening, debit, credit and closing per account.
+
+        Period movements come from one aggregation over the filter window
+        grouped by account and month, so no individual line is read.
+        Returns ``(months, accounts)`` where each account dict carries its
+        per-month ``(debit, credit)`` under ``months``.
+        """
+        self.ensure_one()
+        Account = self.env['account.account'].sudo().with_company(self.company_id or self.env.company)
+
+        opening = self._get_opening_balances()
+        self.env.cr.execute(SQL(
+            """
+            SELECT aml.account_id, DATE_TRUNC('month', aml.date)::date AS month,
+                   SUM(aml.debit), SUM(aml.credit)
+              FROM account_move_line aml
+             WHERE %s
+          GROUP BY aml.account_id, month
+            """,
+            SQL(" AND ").join(self._get_period_conditions()),
+        ))
+        movements = defaultdict(dict)
+        for account_id, month, debit, credit in self.env.cr.fetchall():
+            movements[account_id][month] = (debit or 0.0, credit or 0.0)
+
+        account_ids = set(opening) | set(movements)
+        accounts = Account.search([('id', 'in', list(account_ids))], order='code') if account_ids else Account
+        months = sorted({month for account_months in movements.values() for month in account_months})
+
+        summary = []
+        for account in accounts:
+            opening_debit, opening_credit = opening.get(account.id, (0.0, 0.0))
+            account_months = movements.get(account.id, {})
+            debit = sum(month_debit for month_debit, dummy in account_months.values())
+            credit = sum(month_credit for dummy, month_credit in account_months.values())
+            opening_balance = opening_debit - opening_credit
+            summary.append({
+                'account': account,
+                'label': f"{account.code} - {account.name}",
+                'opening_balance': opening_balance,
+                'debit': debit,
+                'credit': credit,
+                'closing_balance': opening_balance + debit - credit,
+                'months': account_months,
+            })
+        return months, summary
+
+    # --------------------------------------------
+    # Compute HTML
+    # --------------------------------------------
+    def _build_summary_html(self):
+        self.ensure_one()
+        months, summary = self._get_summary_data()
+        if not self.summary_by_month:
+            months = []
+
+        html = "<h3>General Ledger - Trial Balance</h3>"
+        html += (
+            "<table border='1' cellpadding='2' cellspacing='0' "
+            "style='border-collapse: collapse; font-size: 11px; width: 100%;'>"
+        )
+        html += (
+            "<tr style='background:#f1f1f1;'><th>Account</th><th>Opening Balance</th>"
+            + "".join(f"<th>{month.strftime('%b %Y')}</th>" for month in months)
+            + "<th>Total Debit</th><th>Total Credit</th><th>Closing Balance</th></tr>"
+        )
+
+        totals = {'opening_balance': 0.0, 'debit': 0.0, 'credit': 0.0, 'closing_balance': 0.0}
+        month_totals = defaultdict(float)
+        for account_data in summary:
+            html += f"<tr><td>{account_data['label']}</td><td style='text-align:right;'>{account_data['opening_balance']:,.2f}</td>"
+            for month in months:
+                debit, credit = account_data['months'].get(month, (0.0, 0.0))
+                month_totals[month] += debit - credit
+                html += f"<td style='text-align:right;'>{debit - credit:,.2f}</td>"
+            html += (
+                f"<td style='text-align:right;'>{account_data['debit']:,.2f}</td>"
+                f"<td style='text-align:right;'>{account_data['credit']:,.2f}</td>"
+                f"<td style='text-align:right;'>{account_data['closing_balance']:,.2f}</td></tr>"
             )
+            for key in totals:
+                totals[key] += account_data[key]
+
+        html += (
+            f"<tr style='background:#a0c4ff; font-weight:bold;'><td>Total</td>"
+            f"<td style='text-align:right;'>{totals['opening_balance']:,.2f}</td>"
+            + "".join(f"<td style='text-align:right;'>{month_totals[month]:,.2f}</td>" for month in months)
+            + f"<td style='text-align:right;'>{totals['debit']:,.2f}</td>"
+            f"<td style='text-align:right;'>{totals['credit']:,.2f}</td>"
+            f"<td style='text-align:right;'>{totals['closing_balance']:,.2f}</td></tr>"
+        )
+        html += "</table>"
+        return html
+
+    @api.depends('date_from', 'date_to', 'account_id', 'partner_id', 'company_id', 'report_mode', 'summary_by_month')
+    def _compute_trial_balance(self):
+        for rec in self:
+            rec.trial_balance = rec._build_summary_html() if rec.report_mode == 'summary' else False
 
+    @api.depends('date_from', 'date_to', 'account_id', 'partner_id', 'company_id')
+    def _compute_journal_breakdowns(self):
+        for rec in self:
             widths = {
                 "account": 30,
                 "date": 14,
@@ -54,36 +459,12 @@ class GeneralLedger(models.Model):
 
             breakdown = []
 
-            for account in accounts:
-                base_domain = [
-                    ('account_id', '=', account.id),
-                    ('move_id.state', '=', 'posted'),
-                ]
-                if rec.partner_id:
-                    base_domain.append(('partner_id', '=', rec.partner_id.id))
-                if rec.company_id:
-                    base_domain.append(('company_id', '=', rec.company_id.id))
-
-                opening_balance = 0.0
-                if rec.date_from:
-                    opening_domain = base_domain + [('date', '<', rec.date_from)]
-                    opening_lines = AccountMoveLine.search(opening_domain)
-                    for ol in opening_lines:
-                        opening_balance += (ol.debit or 0.0) - (ol.credit or 0.0)
-
-                period_domain = list(base_domain)
-                if rec.date_from:
-                    period_domain.append(('date', '>=', rec.date_from))
-                if rec.date_to:
-                    period_domain.append(('date', '<=', rec.date_to))
-
-                move_lines = AccountMoveLine.search(period_domain, order='date, id')
-
-                if not move_lines and not (rec.date_from or rec.date_to):
-                    continue
+            for account_data in rec._get_ledger_data():
+                account_label = account_data['label']
+                opening_balance = account_data['opening_balance']
 
                 breakdown.append(
-                    f"ACCOUNT_HEADER||Account: {account.code} - {account.name}"
+                    f"ACCOUNT_HEADER||Account: {account_label}"
                 )
 
                 header = "| {account} | {date} | {ref} | {label} | {group} | {partner} | {counter} | {amount_dr} | {amount_cr} | {balance} |".format(
@@ -100,71 +481,14 @@ class GeneralLedger(models.Model):
                 )
                 breakdown.append(header)
 
-                period_balance = 0.0
-                period_debit_total = 0.0
-                period_credit_total = 0.0
-                account_rows = []
-
-                running_balance = opening_balance
-
-                for line in move_lines:
-                    # Use sudo on move_id relations to avoid cross-company blocks
-                    move = line.move_id.sudo()
-                    label = (line.name or move.name or "Unavailable")[:widths["label"]]
-                    ref = (move.ref or move.name or "Unavailable")[:widths["ref"]]
-                    
-                    product_group = (
-                        line.product_id.sudo().categ_id.name
-                        if line.product_id and line.product_id.sudo().categ_id
-                        else "Unavailable"
-                    )[:widths["group"]]
-                    
-                    partner_name = (line.partner_id.sudo().name or "Unavailable")[:widths["partner"]]
-
-                    # SAFE COUNTER ACCOUNTS FETCH (Bypasses security rule blocks)
-                    counter_accounts = move.line_ids.sudo().filtered(
-                        lambda l: l != line and l.account_id != line.account_id
-                    )
-                    counter = ", ".join(
-                        set(
-                            f"{l.account_id.sudo().code} - {l.account_id.sudo().name}"
-                            for l in counter_accounts
-                        )
-                    )
-                    counter = (counter or "Unavailable")[:widths["counter"]]
-
-                    amount_dr = line.debit or 0.0
-                    amount_cr = line.credit or 0.0
-
-                    delta = amount_dr - amount_cr
-                    period_balance += delta
-                    running_balance += delta
-
-                    period_debit_total += amount_dr
-                    period_credit_total += amount_cr
-
-                    row = "| {account} | {date} | {ref} | {label} | {group} | {partner} | {counter} | {amount_dr} | {amount_cr} | {balance} |".format(
-                        account=f"{account.code} - {account.name}"[:widths["account"]].ljust(widths["account"]),
-                        date=str(line.date)[:widths["date"]].ljust(widths["date"]),
-                        ref=ref.ljust(widths["ref"]),
-                        label=label.ljust(widths["label"]),
-                        group=product_group.ljust(widths["group"]),
-                        partner=partner_name.ljust(widths["partner"]),
-                        counter=counter.ljust(widths["counter"]),
-                        amount_dr="{:,.2f}".format(amount_dr).rjust(widths["amount_dr"]),
-                        amount_cr="{:,.2f}".format(amount_cr).rjust(widths["amount_cr"]),
-                        balance="{:,.2f}".format(running_balance).rjust(widths["balance"]),
-                    )
-                    account_rows.append(row)
-
-                closing_balance = opening_balance + period_balance
+                closing_balance = account_data['closing_balance']
 
                 summary_label = f"Opening Balance: {opening_balance:,.2f}"[:widths["open"]].rjust(widths["open"])
                 summary_partner = ((rec.partner_id.name or "")[:widths["partner"]] if rec.partner_id else "")
                 closing_text = f"Closing: {closing_balance:,.2f}"[:widths["balance"]].rjust(widths["balance"])
 
                 summary_row = "| {account} | {date} | {ref} | {amount_cr} | {group} | {partner} | {amount_dr} | {amount_dr} |{label} | {balance} |".format(
-                    account=f"{account.code} - {account.name}"[:widths["account"]].ljust(widths["account"]),
+                    account=account_label[:widths["account"]].ljust(widths["account"]),
                     date="".ljust(widths["date"]),
                     ref="".ljust(widths["ref"]),
                     label=summary_label,
@@ -177,7 +501,30 @@ class GeneralLedger(models.Model):
                 )
 
                 breakdown.append(summary_row)
-                breakdown.extend(account_rows)
+
+                for line in account_data['lines']:
+                    label = (line['label'] or "Unavailable")[:widths["label"]]
+                    ref = (line['ref'] or "Unavailable")[:widths["ref"]]
+                    product_group = (line['product_group'] or "Unavailable")[:widths["group"]]
+                    partner_name = (line['partner'] or "Unavailable")[:widths["partner"]]
+                    counter = (line['counter'] or "Unavailable")[:widths["counter"]]
+
+                    amount_dr = line['debit'] or 0.0
+                    amount_cr = line['credit'] or 0.0
+
+                    row = "| {account} | {date} | {ref} | {label} | {group} | {partner} | {counter} | {amount_dr} | {amount_cr} | {balance} |".format(
+                        account=account_label[:widths["account"]].ljust(widths["account"]),
+                        date=str(line['date'])[:widths["date"]].ljust(widths["date"]),
+                        ref=ref.ljust(widths["ref"]),
+                        label=label.ljust(widths["label"]),
+                        group=product_group.ljust(widths["group"]),
+                        partner=partner_name.ljust(widths["partner"]),
+                        counter=counter.ljust(widths["counter"]),
+                        amount_dr="{:,.2f}".format(amount_dr).rjust(widths["amount_dr"]),
+                        amount_cr="{:,.2f}".format(amount_cr).rjust(widths["amount_cr"]),
+                        balance="{:,.2f}".format(line['balance']).rjust(widths["balance"]),
+                    )
+                    breakdown.append(row)
 
                 total_label = "Total".ljust(widths["label"])
                 total_row = "| {account} | {date} | {ref} | {label} | {group} | {partner} | {counter} | {amount_dr} | {amount_cr} | {balance} |".format(
@@ -188,8 +535,8 @@ class GeneralLedger(models.Model):
                     group="".ljust(widths["group"]),
                     partner="".ljust(widths["partner"]),
                     counter="".ljust(widths["counter"]),
-                    amount_dr="{:,.2f}".format(period_debit_total).rjust(widths["amount_dr"]),
-                    amount_cr="{:,.2f}".format(period_credit_total).rjust(widths["amount_cr"]),
+                    amount_dr="{:,.2f}".format(account_data['period_debit']).rjust(widths["amount_dr"]),
+                    amount_cr="{:,.2f}".format(account_data['period_credit']).rjust(widths["amount_cr"]),
                     balance="{:,.2f}".format(closing_balance).rjust(widths["balance"]),
                 )
                 breakdown.append(total_row)
@@ -225,3 +572,51 @@ class GeneralLedger(models.Model):
             'url': '/general_ledger/export_xlsx?record_id=%s' % self.id,
             'target': 'self',
         }
+
+    def action_export_xlsx_parallel(self):
+        # Year-end ledgers outlast the HTTP worker timeout: queue the
+        # sharded export for the cron worker, the file lands on the record
+        self.write({'parallel_export_state': 'queued', 'parallel_export_file': False, 'parallel_export_filename': False})
+        self.env.ref('monstar_main.ir_cron_general_ledger_parallel_export')._trigger()
+        return True
+
+    @api.model
+    def _cron_parallel_export(self):
+        # Imported here: the export engine lives with the HTTP route
+        from ..controllers.general_ledger_parallel import build_parallel_export
+
+        for ledger in self.search([('parallel_export_state', '=', 'queued')]):
+            try:
+                filename, _content_type, content = build_parallel_export(ledger, as_zip=ledger.parallel_export_archive)
+                ledger.write({
+                    'parallel_export_state': 'done',
+                    'parallel_export_file': base64.b64encode(content),
+                    'parallel_export_filename': filename,
+                })
+                self.env.cr.commit()
+            except Exception:
+                _logger.exception("Parallel export of general ledger %s failed", ledger.id)
+                self.env.cr.rollback()
+                ledger.parallel_export_state = 'failed'
+                self.env.cr.commit()
+
+    def action_export_csv(self):
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/general_ledger/export_stream?record_id=%s&fmt=csv' % self.id,
+            'target': 'self',
+        }
+
+    def action_export_ndjson(self):
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/general_ledger/export_stream?record_id=%s&fmt=ndjson' % self.id,
+            'target': 'self',
+        }
+
+    def action_export_summary_xlsx(self):
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/general_ledger/export_summary_xlsx?record_id=%s' % self.id,
+            'target': 'self',
+        }
@@ -0,0 +1,48 @@
+from odoo import api, fields, models
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+
+class GroupPartyBalance(models.Model):
+    _name = 'group.party.balance'
+    _description = "Partner Ledger Group Period Totals per Entry"
+    _log_access = False
+    _order = 'report_id, partner_id, id'
+
+    # Period totals of the last group.party run, one row per (entry,
+    # partner, company). Only these totals are kept: the report lines are
+    # always read from the journal items. Rows are only written through SQL
+    # by group.party._refresh_snapshot(); a refresh replaces the rows of the
+    # entries touched from the report's watermark on. Deleting an entry
+    # deletes its rows, so the totals never keep a deleted entry.
+    report_id = fields.Many2one('group.party', string="Report", required=True, readonly=True, ondelete='cascade')
+    move_id = fields.Many2one('account.move', string="Journal Entry", required=True, readonly=True, index=True, ondelete='cascade')
+    partner_id = fields.Many2one('res.partner', string="Partner", required=True, readonly=True)
+    company_id = fields.Many2one('res.company', string="Company", required=True, readonly=True)
+    currency_id = fields.Many2one(related='company_id.currency_id')
+    debit = fields.Monetary(string="Debit", readonly=True)
+    credit = fields.Monetary(string="Credit", readonly=True)
+    ar_net = fields.Monetary(string="Receivable Net", readonly=True)
+    ap_net = fields.Monetary(string="Payable Net", readonly=True)
+
+    def init(self):
+        super().init()
+        create_index(self.env.cr, 'group_party_balance_report_move_idx', self._table, ['report_id', 'move_id'])
+
+    @api.model
+    def _get_totals(self, report_id):
+        """Return ``{(partner_id, company_id): (debit, credit, ar_net, ap_net)}``
+        of ``report_id``, shaped like ``group.party._get_period_totals``."""
+        self.env.cr.execute(SQL(
+            """
+            SELECT partner_id, company_id, SUM(debit), SUM(credit), SUM(ar_net), SUM(ap_net)
+              FROM group_party_balance
+             WHERE report_id = %s
+          GROUP BY partner_id, company_id
+            """,
+            report_id,
+        ))
+        return {
+            (partner_id, company_id): tuple(float(amount or 0.0) for amount in amounts)
+            for partner_id, company_id, *amounts in self.env.cr.fetchall()
+        }
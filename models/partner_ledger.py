@@ -1,5 +1,9 @@
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+
 from odoo import api, models, fields
-from collections import defaultdict
+from odoo.tools import SQL, date_utils
 
 class PartnerLedgerGroup(models.Model):
     _name = 'partner.ledger'
@@ -9,6 +13,24 @@ class PartnerLedgerGroup(models.Model):
     date_to = fields.Date(string="End Date")
     product_categ_id = fields.Many2one('product.category', string="Product Category")
     partner_id = fields.Many2one('res.partner', string="Partner")
+    category_rollup = fields.Boolean(
+        string="Roll Up Category Tree",
+        help="Include the subcategories of the selected category and show "
+             "per-partner subtotals at every level of the category tree.",
+    )
+    comparison = fields.Selection(
+        [
+            ('none', "No Comparison"),
+            ('previous_period', "Previous Period"),
+            ('previous_year', "Same Period Last Year"),
+        ],
+        string="Compare With",
+        default='none',
+        required=True,
+        help="Add opening, debit, credit and closing columns for earlier "
+             "periods. Needs both a start and an end date.",
+    )
+    comparison_periods = fields.Integer(string="Number of Periods", default=1)
     
     # NEW: company filter
     company_id = fields.Many2one(
@@ -22,52 +44,239 @@ class PartnerLedgerGroup(models.Model):
         store=False
     )
 
-    @api.depends('date_from', 'date_to', 'product_categ_id', 'partner_id', 'company_id')
-    def _compute_journal_breakdown(self):
-        AccountMoveLine = self.env['account.move.line'].sudo()
-
-        # Fetch base URL safely from system parameters without using http request
-        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url', '').rstrip('/')
-        full_url = f"{base_url}/odoo/partner-ledger"
+    def _get_comparison_windows(self):
+        """Return ``[(label, date_from, date_to), ...]``: the report period
+        first, then the comparison periods, most recent first."""
+        self.ensure_one()
+        windows = [(self._get_window_label(self.date_from, self.date_to), self.date_from, self.date_to)]
+        if self.comparison == 'none' or not (self.date_from and self.date_to):
+            return windows
 
-        for rec in self:
-            base_domain = [('partner_id', '!=', False), ('move_id.state', '=', 'posted')]
-            if rec.product_categ_id:
-                base_domain.append(('product_id.categ_id', '=', rec.product_categ_id.id))
-            if rec.partner_id:
-                base_domain.append(('partner_id', '=', rec.partner_id.id))
-            if rec.company_id:
-                base_domain.append(('company_id', '=', rec.company_id.id))
-
-            trx_domain = list(base_domain)
-            if rec.date_from:
-                trx_domain.append(('date', '>=', rec.date_from))
-            if rec.date_to:
-                trx_domain.append(('date', '<=', rec.date_to))
-
-            if rec.date_from:
-                opening_domain = list(base_domain)
-                opening_domain.append(('date', '<', rec.date_from))
-                opening_lines = AccountMoveLine.search(opening_domain)
+        # Whole months shift by whole months, other periods by their length in days
+        whole_months = self.date_from.day == 1 and self.date_to == date_utils.end_of(self.date_to, 'month')
+        months = (self.date_to.year - self.date_from.year) * 12 + self.date_to.month - self.date_from.month + 1
+        days = (self.date_to - self.date_from).days + 1
+        for period in range(1, max(self.comparison_periods, 1) + 1):
+            if self.comparison == 'previous_year':
+                date_from = self.date_from - relativedelta(years=period)
+                date_to = self.date_to - relativedelta(years=period)
+            elif whole_months:
+                date_from = self.date_from - relativedelta(months=months * period)
+                date_to = date_from + relativedelta(months=months, days=-1)
             else:
-                opening_lines = AccountMoveLine.browse()
+                date_from = self.date_from - timedelta(days=days * period)
+                date_to = self.date_to - timedelta(days=days * period)
+            windows.append((self._get_window_label(date_from, date_to), date_from, date_to))
+        return windows
+
+    @api.model
+    def _get_window_label(self, date_from, date_to):
+        if not (date_from or date_to):
+            return "All Dates"
+        return f"{date_from or '...'} - {date_to or '...'}"
+
+    def _get_summary_source_sql(self, windows):
+        """Subquery of the amounts feeding the summary of ``windows``.
+
+        Columns: categ_id, partner_id, date, debit, credit. History before
+        the earliest window comes from ``account.daily.balance`` with a NULL
+        date; the posted journal items spanning all windows follow, so every
+        window is aggregated from the same rows. In roll-up mode the
+        category filter covers its subtree.
+        """
+        self.ensure_one()
+        hist_conditions = [SQL("hist.partner_id IS NOT NULL")]
+        line_conditions = [SQL("aml.partner_id IS NOT NULL"), SQL("aml.parent_state = 'posted'")]
+        if self.product_categ_id and self.category_rollup:
+            subtree = SQL(
+                "(SELECT id FROM product_category WHERE parent_path LIKE %s)",
+                f"{self.product_categ_id.parent_path}%",
+            )
+            hist_conditions.append(SQL("hist.product_categ_id IN %s", subtree))
+            line_conditions.append(SQL("pt.categ_id IN %s", subtree))
+        elif self.product_categ_id:
+            hist_conditions.append(SQL("hist.product_categ_id = %s", self.product_categ_id.id))
+            line_conditions.append(SQL("pt.categ_id = %s", self.product_categ_id.id))
+        if self.partner_id:
+            hist_conditions.append(SQL("hist.partner_id = %s", self.partner_id.id))
+            line_conditions.append(SQL("aml.partner_id = %s", self.partner_id.id))
+        if self.company_id:
+            hist_conditions.append(SQL("hist.company_id = %s", self.company_id.id))
+            line_conditions.append(SQL("aml.company_id = %s", self.company_id.id))
 
-            trx_lines = AccountMoveLine.search(trx_domain)
+        # Without a start date everything up to date_to is period movement
+        date_from = min(window[1] for window in windows) if all(window[1] for window in windows) else None
+        date_to = max(window[2] for window in windows) if all(window[2] for window in windows) else None
+        if date_from:
+            line_conditions.append(SQL("aml.date >= %s", date_from))
+        if date_to:
+            line_conditions.append(SQL("aml.date <= %s", date_to))
 
-            grouped_data = defaultdict(lambda: defaultdict(lambda: {
-                'opening': 0.0, 'debit': 0.0, 'credit': 0.0
-            }))
+        opening_part = SQL()
+        if date_from:
+            history = self.env['account.daily.balance']._get_history_sql(
+                date_from, self.company_id.ids,
+            )
+            opening_part = SQL(
+                """
+                SELECT hist.product_categ_id AS categ_id, hist.partner_id,
+                       NULL::date AS date, hist.debit, hist.credit
+                  FROM %s AS hist
+                 WHERE %s
+             UNION ALL
+                """,
+                history,
+                SQL(" AND ").join(hist_conditions),
+            )
 
-            for line in opening_lines:
-                group = line.product_id.categ_id.name if line.product_id and line.product_id.categ_id else "Unknown"
-                partner = line.partner_id.name or "Unknown"
-                grouped_data[group][partner]['opening'] += line.debit - line.credit
+        self.env['account.move.line'].flush_model(['partner_id', 'product_id', 'company_id', 'date', 'parent_state', 'debit', 'credit'])
+        return SQL(
+            """
+            (
+                %s
+                SELECT pt.categ_id, aml.partner_id, aml.date, aml.debit, aml.credit
+                  FROM account_move_line aml
+             LEFT JOIN product_product pp ON pp.id = aml.product_id
+             LEFT JOIN product_template pt ON pt.id = pp.product_tmpl_id
+                 WHERE %s
+            )
+            """,
+            opening_part,
+            SQL(" AND ").join(line_conditions),
+        )
 
-            for line in trx_lines:
-                group = line.product_id.categ_id.name if line.product_id and line.product_id.categ_id else "Unknown"
-                partner = line.partner_id.name or "Unknown"
-                grouped_data[group][partner]['debit'] += line.debit
-                grouped_data[group][partner]['credit'] += line.credit
+    @api.model
+    def _get_window_aggregates_sql(self, windows):
+        """Opening, debit and credit of every window as FILTER aggregates
+        over the source rows, aliased ``opening_<i>``, ``debit_<i>``,
+        ``credit_<i>``."""
+        aggregates = []
+        for index, (_label, date_from, date_to) in enumerate(windows):
+            period = [SQL("src.date IS NOT NULL")]
+            if date_from:
+                period.append(SQL("src.date >= %s", date_from))
+            if date_to:
+                period.append(SQL("src.date <= %s", date_to))
+            opening = SQL("src.date IS NULL OR src.date < %s", date_from) if date_from else SQL("FALSE")
+            period = SQL(" AND ").join(period)
+            aggregates += [
+                SQL("COALESCE(SUM(src.debit - src.credit) FILTER (WHERE %s), 0) AS %s",
+                    opening, SQL.identifier(f"opening_{index}")),
+                SQL("COALESCE(SUM(src.debit) FILTER (WHERE %s), 0) AS %s",
+                    period, SQL.identifier(f"debit_{index}")),
+                SQL("COALESCE(SUM(src.credit) FILTER (WHERE %s), 0) AS %s",
+                    period, SQL.identifier(f"credit_{index}")),
+            ]
+        return SQL(", ").join(aggregates)
+
+    def _get_summary_data(self):
+        """Return the (category, partner) summary in a single grouped query.
+
+        Amounts are summed per (category id, partner id), so partners or
+        categories sharing a name are kept apart, and every window of
+        ``_get_comparison_windows`` is aggregated in the same scan. In
+        roll-up mode every category of the tree (down from the filtered
+        one) gets the totals of its whole subtree: the leaf sums are
+        expanded to their ancestors through ``parent_path`` and regrouped
+        in the same statement. Result::
+
+            [{'categ_id', 'group', 'level', 'partners': [
+                {'partner_id', 'partner', 'opening', 'debit', 'credit', 'closing',
+                 'comparisons': [{'opening', 'debit', 'credit', 'closing'}, ...]}, ...
+            ]}, ...]
+        """
+        self.ensure_one()
+        windows = self._get_comparison_windows()
+        leaf = SQL(
+            """
+            SELECT src.categ_id, src.partner_id, %s
+              FROM %s AS src
+          GROUP BY src.categ_id, src.partner_id
+            """,
+            self._get_window_aggregates_sql(windows),
+            self._get_summary_source_sql(windows),
+        )
+        amounts = [
+            SQL.identifier('leaf', f"{column}_{index}")
+            for index in range(len(windows))
+            for column in ('opening', 'debit', 'credit')
+        ]
+
+        if self.category_rollup:
+            root_path = self.product_categ_id.parent_path or ""
+            self.env['product.category'].flush_model(['parent_path', 'complete_name'])
+            self.env.cr.execute(SQL(
+                """
+                WITH leaf AS (%s)
+                SELECT node.id, node.complete_name, node.parent_path,
+                       leaf.partner_id, partner.name, %s
+                  FROM leaf
+                  JOIN res_partner partner ON partner.id = leaf.partner_id
+             LEFT JOIN product_category pc ON pc.id = leaf.categ_id
+             LEFT JOIN product_category node ON pc.parent_path LIKE node.parent_path || %s
+                                            AND node.parent_path LIKE %s
+              GROUP BY node.id, node.complete_name, node.parent_path, leaf.partner_id, partner.name
+              -- byte order on the path keeps every subtree right under its root
+              ORDER BY node.parent_path COLLATE "C" NULLS LAST, node.id, partner.name, leaf.partner_id
+                """,
+                leaf,
+                SQL(", ").join(SQL("SUM(%s)", amount) for amount in amounts),
+                "%",
+                f"{root_path}%",
+            ))
+            # Level 0 is the filtered category, or the top-level ones
+            top_depth = root_path.count("/") or 1
+            rows = [
+                (categ_id, group, path.count("/") - top_depth if path else 0, *values)
+                for categ_id, group, path, *values in self.env.cr.fetchall()
+            ]
+        else:
+            self.env.cr.execute(SQL(
+                """
+                WITH leaf AS (%s)
+                SELECT leaf.categ_id, pc.name, leaf.partner_id, partner.name, %s
+                  FROM leaf
+                  JOIN res_partner partner ON partner.id = leaf.partner_id
+             LEFT JOIN product_category pc ON pc.id = leaf.categ_id
+              ORDER BY pc.name NULLS LAST, leaf.categ_id, partner.name, leaf.partner_id
+                """,
+                leaf,
+                SQL(", ").join(amounts),
+            ))
+            rows = [(categ_id, group, 0, *values) for categ_id, group, *values in self.env.cr.fetchall()]
+
+        summary = []
+        for categ_id, group, level, partner_id, partner, *values in rows:
+            if not summary or summary[-1]['categ_id'] != categ_id:
+                summary.append({'categ_id': categ_id, 'group': group or "Unknown", 'level': level, 'partners': []})
+            periods = []
+            for index in range(0, len(values), 3):
+                opening, debit, credit = (value or 0.0 for value in values[index:index + 3])
+                periods.append({
+                    'opening': opening,
+                    'debit': debit,
+                    'credit': credit,
+                    'closing': opening + debit - credit,
+                })
+            summary[-1]['partners'].append({
+                'partner_id': partner_id,
+                'partner': partner or "Unknown",
+                **periods[0],
+                'comparisons': periods[1:],
+            })
+        return summary
+
+    @api.depends('date_from', 'date_to', 'product_categ_id', 'partner_id', 'company_id',
+                 'category_rollup', 'comparison', 'comparison_periods')
+    def _compute_journal_breakdown(self):
+        # Fetch base URL safely from system parameters without using http request
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url', '').rstrip('/')
+        full_url = f"{base_url}/odoo/partner-ledger"
+
+        for rec in self:
+            windows = rec._get_comparison_windows()
+            summary = rec._get_summary_data()
+            columns = 1 + 4 * len(windows)
 
             html = (
                 "<h3>Party Ledger: Group Summary (One Line Per Partner) "
@@ -76,40 +285,45 @@ class PartnerLedgerGroup(models.Model):
                 "</small></h3>"
             )
 
-            for group, partners in grouped_data.items():
-                html += f"<h4 style='background:#add8e6;padding:4px;'>{group}</h4>"
+            for category in summary:
+                html += (
+                    f"<h4 style='background:#add8e6;padding:4px;margin-left:{category['level'] * 20}px;'>"
+                    f"{category['group']}</h4>"
+                )
                 html += "<table border='1' cellpadding='3' cellspacing='0' style='border-collapse: collapse; font-size: 12px; width:100%;'>"
-                html += "<tr><td><strong>Group Filter:</strong></td><td colspan='5'>%s</td></tr>" % (
-                    rec.product_categ_id.name if rec.product_categ_id else "All"
+                html += "<tr><td><strong>Group Filter:</strong></td><td colspan='%s'>%s</td></tr>" % (
+                    columns - 1, rec.product_categ_id.name if rec.product_categ_id else "All"
                 )
                 if rec.partner_id:
-                    html += "<tr><td><strong>Partner Filter:</strong></td><td colspan='5'>%s</td></tr>" % rec.partner_id.name
-                html += "<tr><td><strong>Company Filter:</strong></td><td colspan='5'>%s</td></tr>" % (
-                    rec.company_id.name if rec.company_id else "All"
+                    html += "<tr><td><strong>Partner Filter:</strong></td><td colspan='%s'>%s</td></tr>" % (
+                        columns - 1, rec.partner_id.name
+                    )
+                html += "<tr><td><strong>Company Filter:</strong></td><td colspan='%s'>%s</td></tr>" % (
+                    columns - 1, rec.company_id.name if rec.company_id else "All"
                 )
 
+                if len(windows) > 1:
+                    html += "<tr style='background:#ddd;'><th></th>"
+                    html += "".join(f"<th colspan='4'>{label}</th>" for label, _from, _to in windows)
+                    html += "</tr>"
                 html += (
                     "<tr style='background:#ddd;'>"
-                    "<th>Partner</th><th>Opening Balance</th>"
-                    "<th>Total Debit</th><th>Total Credit</th><th>Closing Balance</th>"
-                    "</tr>"
+                    "<th>Partner</th>"
+                    + "<th>Opening Balance</th><th>Total Debit</th>"
+                      "<th>Total Credit</th><th>Closing Balance</th>" * len(windows)
+                    + "</tr>"
                 )
 
-                for partner, values in partners.items():
-                    opening = values['opening']
-                    debit = values['debit']
-                    credit = values['credit']
-                    closing = opening + debit - credit
-
-                    html += (
-                        f"<tr>"
-                        f"<td>{partner}</td>"
-                        f"<td>{'{:,.0f}'.format(opening)}</td>"
-                        f"<td>{'{:,.0f}'.format(debit)}</td>"
-                        f"<td>{'{:,.0f}'.format(credit)}</td>"
-                        f"<td>{'{:,.0f}'.format(closing)}</td>"
-                        f"</tr>"
-                    )
+                for values in category['partners']:
+                    html += f"<tr><td>{values['partner']}</td>"
+                    for period in [values] + values['comparisons']:
+                        html += (
+                            f"<td>{'{:,.0f}'.format(period['opening'])}</td>"
+                            f"<td>{'{:,.0f}'.format(period['debit'])}</td>"
+                            f"<td>{'{:,.0f}'.format(period['credit'])}</td>"
+                            f"<td>{'{:,.0f}'.format(period['closing'])}</td>"
+                        )
+                    html += "</tr>"
 
                 html += "</table><br>"
 
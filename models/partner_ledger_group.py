@@ -1,4 +1,8 @@
 from odoo import api, models, fields
+from odoo.tools import SQL
+
+# Product lines per partner fetched by one keyset page of the viewer
+PLG_PAGE_SIZE = 100
 
 
 class PartnerLedgerGroup(models.Model):
@@ -15,43 +19,356 @@ class PartnerLedgerGroup(models.Model):
         string="Filter by Company",
         default=lambda self: self.env.company,
     )
+    granularity = fields.Selection(
+        [
+            ('line', "Per Line"),
+            ('move_product', "Per Invoice and Product"),
+            ('day_product', "Per Day and Product"),
+        ],
+        string="Granularity",
+        default='line',
+        required=True,
+        help="Collapse the product lines of the same invoice, or of the same "
+             "day, into one row per product.",
+    )
+    show_price_statistics = fields.Boolean(
+        string="Show Price Statistics",
+        help="Show min, max, weighted average and last unit price per partner and product.",
+    )
+    price_statistics = fields.Html(
+        string="Price Statistics",
+        compute="_compute_price_statistics",
+        store=False,
+    )
     partner_journal_breakdown = fields.Html(
         string="Partner Journal Breakdown",
         compute="_compute_journal_breakdown",
         store=False,
     )
 
-    @api.depends('date_from', 'date_to', 'partner_id', 'company_id')
-    def _compute_journal_breakdown(self):
-        # Use sudo() across base models to bypass multi-company record rule locks
-        AccountMoveLine = self.env['account.move.line'].sudo()
-        AccountAccount = self.env['account.account'].sudo()
+    def _get_receivable_payable_accounts(self):
+        """Receivable and payable accounts of the selected company (all if none)."""
+        self.ensure_one()
+        account_domain = [
+            ('account_type', 'in', ['asset_receivable', 'liability_payable'])
+        ]
+        if self.company_id:
+            account_domain.append(('company_ids', 'in', self.company_id.id))
+        return self.env['account.account'].sudo().search(account_domain)
+
+    def _get_partner_balances(self, partner_ids):
+        """Return ``{partner_id: balance}`` on the receivable/payable accounts.
+
+        The account set is resolved once and every partner is summed in the
+        same grouped query, instead of one search and one read_group per
+        partner.
+        """
+        self.ensure_one()
+        if not partner_ids:
+            return {}
+        balance_domain = [
+            ('partner_id', 'in', list(partner_ids)),
+            ('account_id', 'in', self._get_receivable_payable_accounts().ids),
+            ('parent_state', '=', 'posted'),
+        ]
+        if self.company_id:
+            balance_domain.append(('company_id', '=', self.company_id.id))
+        return {
+            partner.id: debit - credit
+            for partner, debit, credit in self.env['account.move.line'].sudo()._read_group(
+                balance_domain, groupby=['partner_id'], aggregates=['debit:sum', 'credit:sum'],
+            )
+        }
+
+    # --------------------------------------------
+    # Keyset-paged product lines (viewer widget)
+    # --------------------------------------------
+    def _get_line_conditions(self):
+        """Product lines of the report as SQL conditions on ``account_move_line aml``."""
+        self.ensure_one()
+        conditions = [
+            SQL("aml.partner_id IS NOT NULL"),
+            SQL("aml.parent_state = 'posted'"),
+            SQL("aml.product_id IS NOT NULL"),
+        ]
+        if self.date_from:
+            conditions.append(SQL("aml.date >= %s", self.date_from))
+        if self.date_to:
+            conditions.append(SQL("aml.date <= %s", self.date_to))
+        if self.partner_id:
+            conditions.append(SQL("aml.partner_id = %s", self.partner_id.id))
+        if self.company_id:
+            conditions.append(SQL("aml.company_id = %s", self.company_id.id))
+        return conditions
+
+    def _get_line_page_sql(self, conditions, seed, limit, after=None):
+        """One (date, id)-ordered page of report rows matching ``conditions``,
+        with the running balance started at ``seed`` and resuming after the
+        ``(date, id)`` key ``after``.
+
+        At ``line`` granularity a row is a journal item and the window runs
+        along the keyset index, so it stops reading after ``limit`` rows.
+        Coarser granularities collapse the items in the GROUP BY (keyed on
+        their smallest id), so only the collapsed rows leave the database.
+        ``limit=None`` returns every row.
+        """
+        self.ensure_one()
+        if (self.granularity or 'line') == 'line':
+            if after:
+                conditions = conditions + [SQL("(aml.date, aml.id) > (%s, %s)", *after)]
+            return SQL(
+                """
+                SELECT aml.id, aml.partner_id, aml.date, aml.name, aml.move_name, aml.ref,
+                       aml.product_id, aml.account_id, aml.quantity, aml.debit, aml.credit,
+                       pc.name AS product_group,
+                       %s::numeric + SUM(aml.debit - aml.credit) OVER (
+                           ORDER BY aml.date, aml.id
+                           ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+                       ) AS balance
+                  FROM account_move_line aml
+             LEFT JOIN product_product pp ON pp.id = aml.product_id
+             LEFT JOIN product_template pt ON pt.id = pp.product_tmpl_id
+             LEFT JOIN product_category pc ON pc.id = pt.categ_id
+                 WHERE %s
+              ORDER BY aml.date, aml.id
+                 LIMIT %s
+                """,
+                seed,
+                SQL(" AND ").join(conditions),
+                limit,
+            )
+
+        group_by = [SQL("aml.partner_id"), SQL("aml.date"), SQL("aml.product_id"), SQL("aml.account_id"), SQL("pc.name")]
+        if self.granularity == 'move_product':
+            group_by.append(SQL("aml.move_id"))
+        return SQL(
+            """
+            SELECT MIN(aml.id) AS id, aml.partner_id, aml.date,
+                   CASE WHEN MIN(aml.name) = MAX(aml.name) THEN MIN(aml.name)
+                        ELSE COUNT(*) || ' lines' END AS name,
+                   MIN(aml.move_name) AS move_name,
+                   CASE WHEN MIN(aml.move_id) = MAX(aml.move_id) THEN MIN(aml.ref)
+                        ELSE COUNT(DISTINCT aml.move_id) || ' entries' END AS ref,
+                   aml.product_id, aml.account_id, SUM(aml.quantity) AS quantity,
+                   SUM(aml.debit) AS debit, SUM(aml.credit) AS credit,
+                   pc.name AS product_group,
+                   %s::numeric + SUM(SUM(aml.debit - aml.credit)) OVER (
+                       ORDER BY aml.date, MIN(aml.id)
+                       ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+                   ) AS balance
+              FROM account_move_line aml
+         LEFT JOIN product_product pp ON pp.id = aml.product_id
+         LEFT JOIN product_template pt ON pt.id = pp.product_tmpl_id
+         LEFT JOIN product_category pc ON pc.id = pt.categ_id
+             WHERE %s
+          GROUP BY %s
+            HAVING %s
+          ORDER BY aml.date, MIN(aml.id)
+             LIMIT %s
+            """,
+            seed,
+            SQL(" AND ").join(conditions),
+            SQL(", ").join(group_by),
+            SQL("(aml.date, MIN(aml.id)) > (%s, %s)", *after) if after else SQL("TRUE"),
+            limit,
+        )
+
+    def _prepare_lines(self, rows):
+        """Add the display values of the report to fetched line dicts.
+
+        Products and accounts are browsed once per page, so their display
+        names (translations, company-dependent codes) come from the ORM in
+        a couple of batched reads.
+        """
+        products = self.env['product.product'].sudo().browse(list({row['product_id'] for row in rows}))
+        accounts = self.env['account.account'].sudo().with_company(
+            self.company_id or self.env.company
+        ).browse(list({row['account_id'] for row in rows}))
+        product_names = {product.id: product.display_name for product in products}
+        account_names = {account.id: f"{account.code} - {account.name}" for account in accounts}
+        for row in rows:
+            account = account_names.get(row['account_id'], "")
+            debit, credit = row['debit'] or 0.0, row['credit'] or 0.0
+            row.update({
+                'label': row['name'] or row['move_name'] or "Unavailable",
+                'ref': row['ref'] or row['move_name'] or "Unavailable",
+                'product_group': row['product_group'] or "Unavailable",
+                'product': product_names.get(row['product_id'], "Unavailable"),
+                'unit_price': (debit or credit) / row['quantity'] if row['quantity'] else 0.0,
+                'account_dr': account if debit else "",
+                'account_cr': account if credit else "",
+                'debit': debit,
+                'credit': credit,
+            })
+        return rows
 
+    def _get_partner_line_page(self, partner_id, seed=0.0, after=None, limit=PLG_PAGE_SIZE):
+        """Return the page of ``partner_id``'s product lines following the
+        ``(date, id)`` key ``after``; ``seed`` is the running balance there."""
+        self.ensure_one()
+        conditions = self._get_line_conditions() + [SQL("aml.partner_id = %s", partner_id)]
+        self.env['account.move.line'].flush_model()
+        self.env.cr.execute(self._get_line_page_sql(conditions, seed, limit, after=after))
+        return self._prepare_lines(self.env.cr.dictfetchall())
+
+    def _get_row_count_sql(self):
+        """Number of report rows of a partner at the selected granularity."""
+        if self.granularity == 'move_product':
+            return SQL("COUNT(DISTINCT (aml.move_id, aml.product_id, aml.account_id))")
+        if self.granularity == 'day_product':
+            return SQL("COUNT(DISTINCT (aml.date, aml.product_id, aml.account_id))")
+        return SQL("COUNT(*)")
+
+    def _get_partner_overview(self, limit=PLG_PAGE_SIZE, with_lines=True):
+        """Return one entry per partner with product lines, ordered by name:
+        row count at the selected granularity, period debit/credit,
+        receivable/payable balance and the first page of rows (``lines``,
+        all of them with ``limit=None``, none without ``with_lines``). Three
+        queries whatever the number of partners or lines: totals, balances
+        and all first pages through a LATERAL join on the keyset index.
+        """
+        self.ensure_one()
+        self.env['account.move.line'].flush_model()
+        conditions = self._get_line_conditions()
+        self.env.cr.execute(SQL(
+            """
+            SELECT aml.partner_id, partner.name, %s, SUM(aml.debit), SUM(aml.credit)
+              FROM account_move_line aml
+              JOIN res_partner partner ON partner.id = aml.partner_id
+             WHERE %s
+          GROUP BY aml.partner_id, partner.name
+          ORDER BY partner.name, aml.partner_id
+            """,
+            self._get_row_count_sql(),
+            SQL(" AND ").join(conditions),
+        ))
+        overview = [{
+            'id': partner_id,
+            'name': name or "Unknown",
+            'line_count': line_count,
+            'debit': debit or 0.0,
+            'credit': credit or 0.0,
+            'lines': [],
+        } for partner_id, name, line_count, debit, credit in self.env.cr.fetchall()]
+        if not overview:
+            return overview
+
+        partner_ids = [partner['id'] for partner in overview]
+        balances = self._get_partner_balances(partner_ids)
+        for partner in overview:
+            partner['balance'] = balances.get(partner['id'], 0.0)
+        if not with_lines:
+            return overview
+
+        self.env.cr.execute(SQL(
+            """
+            SELECT page.*
+              FROM unnest(%s::int[]) AS p(partner_id)
+        CROSS JOIN LATERAL (%s) AS page
+            """,
+            partner_ids,
+            self._get_line_page_sql(conditions + [SQL("aml.partner_id = p.partner_id")], 0.0, limit),
+        ))
+        lines_by_partner = {}
+        for row in self._prepare_lines(self.env.cr.dictfetchall()):
+            lines_by_partner.setdefault(row['partner_id'], []).append(row)
+        for partner in overview:
+            partner['lines'] = lines_by_partner.get(partner['id'], [])
+        return overview
+
+    def _get_price_statistics(self):
+        """Return the unit price statistics per (partner, product) over the window.
+
+        One grouped aggregation over the product lines; a line's unit price
+        is its debit (or credit) over its quantity, as in the breakdown.
+        Credit notes and reversal entries count negatively: the quantity is
+        the net quantity and the weighted average is the net amount over
+        it, so a refund lowers the volume instead of adding to it. The last
+        price is the one of the latest line by (date, id)::
+
+            [{'partner_id', 'partner', 'product_id', 'product', 'line_count',
+              'quantity', 'min_price', 'max_price', 'avg_price', 'last_price'}, ...]
+        """
+        self.ensure_one()
+        self.env['account.move.line'].flush_model()
+        self.env.cr.execute(SQL(
+            """
+            WITH priced AS (
+                SELECT aml.id, aml.partner_id, aml.product_id, aml.date, aml.quantity,
+                       CASE WHEN aml.debit != 0 THEN aml.debit ELSE aml.credit END AS amount,
+                       CASE WHEN move.move_type IN ('out_refund', 'in_refund')
+                              OR move.reversed_entry_id IS NOT NULL
+                            THEN -1 ELSE 1 END AS sign
+                  FROM account_move_line aml
+                  JOIN account_move move ON move.id = aml.move_id
+                 WHERE %s
+                   AND aml.quantity != 0
+            )
+            SELECT priced.partner_id, partner.name AS partner, priced.product_id,
+                   COUNT(*) AS line_count,
+                   SUM(priced.sign * priced.quantity) AS quantity,
+                   MIN(priced.amount / priced.quantity) AS min_price,
+                   MAX(priced.amount / priced.quantity) AS max_price,
+                   SUM(priced.sign * priced.amount) / NULLIF(SUM(priced.sign * priced.quantity), 0) AS avg_price,
+                   (ARRAY_AGG(priced.amount / priced.quantity
+                              ORDER BY priced.date DESC, priced.id DESC))[1] AS last_price
+              FROM priced
+              JOIN res_partner partner ON partner.id = priced.partner_id
+          GROUP BY priced.partner_id, partner.name, priced.product_id
+          ORDER BY partner.name, priced.partner_id, priced.product_id
+            """,
+            SQL(" AND ").join(self._get_line_conditions()),
+        ))
+        statistics = self.env.cr.dictfetchall()
+        products = self.env['product.product'].sudo().browse(list({row['product_id'] for row in statistics}))
+        product_names = {product.id: product.display_name for product in products}
+        for row in statistics:
+            row['partner'] = row['partner'] or "Unknown"
+            row['product'] = product_names.get(row['product_id'], "Unavailable")
+            for field in ('quantity', 'min_price', 'max_price', 'avg_price', 'last_price'):
+                row[field] = row[field] or 0.0
+        return statistics
+
+    @api.depends('date_from', 'date_to', 'partner_id', 'company_id', 'show_price_statistics')
+    def _compute_price_statistics(self):
         for rec in self:
-            domain = [
-                ('partner_id', '!=', False),
-                ('move_id.state', '=', 'posted'),
-                ('product_id', '!=', False),  # Only include product lines
-            ]
-
-            if rec.date_from:
-                domain.append(('date', '>=', rec.date_from))
-            if rec.date_to:
-                domain.append(('date', '<=', rec.date_to))
-            if rec.partner_id:
-                domain.append(('partner_id', '=', rec.partner_id.id))
-            if rec.company_id:
-                domain.append(('company_id', '=', rec.company_id.id))
-
-            move_lines = AccountMoveLine.search(domain, order='date, id')
+            if not rec.show_price_statistics:
+                rec.price_statistics = False
+                continue
 
-            breakdown = []
-            lines_by_partner = {}
+            html = "<h3>Unit Price Statistics per Partner and Product</h3>"
+            html += "<table border='1' cellpadding='3' cellspacing='0' style='border-collapse: collapse; font-size: 12px;'>"
+            html += (
+                "<tr style='background:#f1f1f1;'>"
+                "<th>Product</th><th>Lines</th><th>Quantity</th><th>Min Price</th>"
+                "<th>Max Price</th><th>Weighted Avg. Price</th><th>Last Price</th>"
+                "</tr>"
+            )
+            partner_id = None
+            for row in rec._get_price_statistics():
+                if row['partner_id'] != partner_id:
+                    partner_id = row['partner_id']
+                    html += f"<tr style='background:#a0c4ff;'><td colspan='7'><strong>Party: {row['partner']}</strong></td></tr>"
+                html += (
+                    f"<tr>"
+                    f"<td>{row['product']}</td>"
+                    f"<td>{row['line_count']}</td>"
+                    f"<td>{'{:,.2f}'.format(row['quantity'])}</td>"
+                    f"<td>{'{:,.2f}'.format(row['min_price'])}</td>"
+                    f"<td>{'{:,.2f}'.format(row['max_price'])}</td>"
+                    f"<td>{'{:,.2f}'.format(row['avg_price'])}</td>"
+                    f"<td>{'{:,.2f}'.format(row['last_price'])}</td>"
+                    f"</tr>"
+                )
+            html += "</table>"
+            rec.price_statistics = html
 
-            for line in move_lines:
-                # Group by partner ID to avoid recordset access rule crashes
-                partner = line.partner_id.sudo()
-                lines_by_partner.setdefault(partner, []).append(line)
+    @api.depends('date_from', 'date_to', 'partner_id', 'company_id', 'granularity')
+    def _compute_journal_breakdown(self):
+        for rec in self:
+            # Rows come already collapsed to the selected granularity
+            overview = rec._get_partner_overview(limit=None)
+            breakdown = []
 
             widths = {
                 "date": 14,
@@ -67,8 +384,8 @@ class PartnerLedgerGroup(models.Model):
                 "balance": 15,
             }
 
-            for partner, lines in lines_by_partner.items():
-                breakdown.append(f"PARTNER_HEADER||Party: {partner.name}")
+            for partner in overview:
+                breakdown.append(f"PARTNER_HEADER||Party: {partner['name']}")
                 header = "| {date} | {ref} | {label} | {group} | {product_name} | {unit_price} | {account_dr} | {account_cr} | {amount_dr} | {amount_cr} | {balance} |".format(
                     date="Date".center(widths["date"]),
                     ref="Ref".center(widths["ref"]),
@@ -84,37 +401,20 @@ class PartnerLedgerGroup(models.Model):
                 )
                 breakdown.append(header)
 
-                running_balance = 0.0
-
-                for line in lines:
-                    move = line.move_id.sudo()
-                    product = line.product_id.sudo()
-                    account = line.account_id.sudo()
-
-                    label = (line.name or move.name or "Unavailable")[:widths["label"]]
-                    ref = (move.ref or move.name or "Unavailable")[:widths["ref"]]
-                    
-                    product_group = (
-                        product.categ_id.sudo().name 
-                        if product and product.categ_id 
-                        else "Unavailable"
-                    )[:widths["group"]]
-                    
-                    product_name = (product.display_name if product else "Unavailable")[:widths["product_name"]]
-                    
-                    account_dr = f"{account.code} - {account.name}" if line.debit else "Unavailable"
-                    account_cr = f"{account.code} - {account.name}" if line.credit else "Unavailable"
-
-                    unit_price = 0.0
-                    if line.quantity:
-                        unit_price = (line.debit or line.credit) / line.quantity
-
-                    amount_dr = line.debit or 0.0
-                    amount_cr = line.credit or 0.0
-                    running_balance += (amount_dr - amount_cr)
+                for line in partner['lines']:
+                    label = line['label'][:widths["label"]]
+                    ref = line['ref'][:widths["ref"]]
+                    product_group = line['product_group'][:widths["group"]]
+                    product_name = line['product'][:widths["product_name"]]
+                    account_dr = line['account_dr'] or "Unavailable"
+                    account_cr = line['account_cr'] or "Unavailable"
+                    unit_price = line['unit_price']
+                    amount_dr = line['debit']
+                    amount_cr = line['credit']
+                    running_balance = line['balance']
 
                     row = "| {date} | {ref} | {label} | {group} | {product_name} | {unit_price} | {account_dr} | {account_cr} | {amount_dr} | {amount_cr} | {balance} |".format(
-                        date=str(line.date)[:widths["date"]].ljust(widths["date"]),
+                        date=str(line['date'])[:widths["date"]].ljust(widths["date"]),
                         ref=ref[:widths["ref"]].ljust(widths["ref"]),
                         label=label[:widths["label"]].ljust(widths["label"]),
                         group=product_group[:widths["group"]].ljust(widths["group"]),
@@ -128,32 +428,8 @@ class PartnerLedgerGroup(models.Model):
                     )
                     breakdown.append(row)
 
-                # === Calculate Current Balance for Partner Safely ===
-                account_domain = [
-                    ('account_type', 'in', ['asset_receivable', 'liability_payable'])
-                ]
-                if rec.company_id:
-                    account_domain.append(('company_ids', 'in', rec.company_id.id))
-                
-                payable_receivable_accounts = AccountAccount.search(account_domain)
-
-                balance_domain = [
-                    ('partner_id', '=', partner.id),
-                    ('account_id', 'in', payable_receivable_accounts.ids),
-                    ('move_id.state', '=', 'posted'),
-                ]
-                if rec.company_id:
-                    balance_domain.append(('company_id', '=', rec.company_id.id))
-
-                partner_lines = AccountMoveLine.read_group(
-                    domain=balance_domain,
-                    fields=['debit', 'credit'],
-                    groupby=[]
-                )
-                balance = 0.0
-                if partner_lines:
-                    totals = partner_lines[0]
-                    balance = (totals.get('debit', 0.0) - totals.get('credit', 0.0))
+                # === Current Balance for Partner (batched) ===
+                balance = partner['balance']
 
                 # Add summary row with Balance
                 summary_row = f"| {'':{widths['date']}} | {'':{widths['ref']}} | {'':{widths['label']}} | {'':{widths['group']}} | {'':{widths['product_name']}} | {'':{widths['unit_price']}} | {'':{widths['account_dr']}} | {'':{widths['account_cr']}} | {'':{widths['amount_dr']}} | {'':{widths['amount_cr']}} | {'Balance: ' + '{:,.2f}'.format(balance):{widths['balance']}} |"
@@ -0,0 +1,20 @@
+from odoo import models
+
+
+class ProductTemplate(models.Model):
+    _inherit = 'product.template'
+
+    def write(self, vals):
+        if 'categ_id' not in vals:
+            return super().write(vals)
+        # account.daily.balance keys posted items on their product category:
+        # move the items of recategorized products to the new category
+        lines = self.env['account.move.line'].sudo().search([
+            ('product_id.product_tmpl_id', 'in', self.filtered(lambda t: t.categ_id.id != vals['categ_id']).ids),
+            ('parent_state', '=', 'posted'),
+        ])
+        DailyBalance = self.env['account.daily.balance']
+        DailyBalance._apply_lines(lines, -1, invalidate_locked_from_date=False)
+        res = super().write(vals)
+        DailyBalance._apply_lines(lines, 1, invalidate_locked_from_date=False)
+        return res
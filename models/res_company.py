@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from odoo import models
+
+# Lock dates behind which balances are frozen; only those present on this
+# version of res.company are used.
+BALANCE_LOCK_DATE_FIELDS = ('fiscalyear_lock_date', 'period_lock_date', 'hard_lock_date')
+
+
+class ResCompany(models.Model):
+    _inherit = 'res.company'
+
+    def _get_balance_lock_date(self):
+        """Latest date whose balances can no longer change, or False."""
+        self.ensure_one()
+        lock_dates = [
+            self[field] for field in BALANCE_LOCK_DATE_FIELDS
+            if field in self._fields and self[field]
+        ]
+        return max(lock_dates) if lock_dates else False
+
+    def write(self, vals):
+        if not any(field in vals for field in BALANCE_LOCK_DATE_FIELDS):
+            return super().write(vals)
+
+        previous = {company: company._get_balance_lock_date() for company in self}
+        res = super().write(vals)
+        LockedBalance = self.env['account.locked.balance'].sudo()
+        for company, old_lock_date in previous.items():
+            new_lock_date = company._get_balance_lock_date()
+            # Moving the lock date backwards re-opens the period: drop the
+            # frozen balances taken after the new lock date.
+            if old_lock_date and (not new_lock_date or new_lock_date < old_lock_date):
+                LockedBalance._invalidate(
+                    company, new_lock_date + timedelta(days=1) if new_lock_date else None,
+                )
+        return res
@@ -0,0 +1,150 @@
+/** @odoo-module **/
+
+import { Component, onWillStart, onWillUpdateProps, useRef, useState } from "@odoo/owl";
+import { serializeDate } from "@web/core/l10n/dates";
+import { rpc } from "@web/core/network/rpc";
+import { registry } from "@web/core/registry";
+import { standardWidgetProps } from "@web/views/widgets/standard_widget_props";
+import { formatAmount, many2oneId } from "@monstar_main/ledger_viewer/ledger_viewer_utils";
+
+// Fixed row height lets the scroll container size itself on line_count
+// without having the lines loaded yet.
+const ROW_HEIGHT = 24;
+const VIEWPORT_HEIGHT = 480;
+const OVERSCAN = 20;
+
+/**
+ * Lines of one expanded account. Pages are fetched on (date, id) keyset
+ * as the user scrolls and only the rows in view are rendered.
+ */
+export class GLAccountLines extends Component {
+    static template = "monstar_main.GLAccountLines";
+    static props = {
+        account: Object,
+        filters: Object,
+    };
+
+    setup() {
+        this.scrollRef = useRef("scroll");
+        this.state = useState({
+            lines: [],
+            done: false,
+            scrollTop: 0,
+        });
+        this.loading = null;
+        onWillStart(() => this.loadUntil(Math.ceil(VIEWPORT_HEIGHT / ROW_HEIGHT) + OVERSCAN));
+    }
+
+    get viewportHeight() {
+        return Math.min(VIEWPORT_HEIGHT, Math.max(this.props.account.line_count, 1) * ROW_HEIGHT);
+    }
+
+    get totalHeight() {
+        return this.props.account.line_count * ROW_HEIGHT;
+    }
+
+    get visibleLines() {
+        const start = Math.max(0, Math.floor(this.state.scrollTop / ROW_HEIGHT) - OVERSCAN);
+        const end = Math.min(
+            this.state.lines.length,
+            Math.ceil((this.state.scrollTop + VIEWPORT_HEIGHT) / ROW_HEIGHT) + OVERSCAN
+        );
+        return this.state.lines.slice(start, end).map((line, index) => ({
+            line,
+            top: (start + index) * ROW_HEIGHT,
+        }));
+    }
+
+    async loadUntil(count) {
+        while (!this.state.done && this.state.lines.length < count) {
+            await this.loadPage();
+        }
+    }
+
+    loadPage() {
+        if (!this.loading) {
+            const last = this.state.lines.at(-1);
+            this.loading = rpc("/general_ledger/viewer/lines", {
+                account_id: this.props.account.id,
+                filters: this.props.filters,
+                after: last ? [last.date, last.id] : null,
+                seed: last ? last.balance : null,
+            }).then((page) => {
+                this.state.lines.push(...page.lines);
+                this.state.done = page.lines.length < page.limit;
+                this.loading = null;
+            });
+        }
+        return this.loading;
+    }
+
+    onScroll(ev) {
+        this.state.scrollTop = ev.target.scrollTop;
+        this.loadUntil(Math.ceil((this.state.scrollTop + VIEWPORT_HEIGHT) / ROW_HEIGHT) + OVERSCAN);
+    }
+
+    formatAmount(value) {
+        return formatAmount(value);
+    }
+}
+
+/**
+ * General Ledger viewer: renders the account headers with opening and
+ * closing totals first; an account's lines are only fetched once it is
+ * expanded, so time to first paint does not depend on the ledger size.
+ */
+export class GLLedgerViewer extends Component {
+    static template = "monstar_main.GLLedgerViewer";
+    static components = { GLAccountLines };
+    static props = { ...standardWidgetProps };
+
+    setup() {
+        this.state = useState({
+            accounts: [],
+            expanded: {},
+            loaded: false,
+        });
+        this.filtersKey = null;
+        onWillStart(() => this.loadAccounts(this.props));
+        onWillUpdateProps((nextProps) => this.loadAccounts(nextProps));
+    }
+
+    getFilters(props) {
+        const data = props.record.data;
+        return {
+            date_from: data.date_from ? serializeDate(data.date_from) : false,
+            date_to: data.date_to ? serializeDate(data.date_to) : false,
+            account_id: many2oneId(data.account_id),
+            partner_id: many2oneId(data.partner_id),
+            company_id: many2oneId(data.company_id),
+        };
+    }
+
+    async loadAccounts(props) {
+        const filters = this.getFilters(props);
+        const filtersKey = JSON.stringify(filters);
+        if (filtersKey === this.filtersKey) {
+            return;
+        }
+        this.filtersKey = filtersKey;
+        this.filters = filters;
+        const accounts = await rpc("/general_ledger/viewer/accounts", { filters });
+        if (filtersKey === this.filtersKey) {
+            this.state.accounts = accounts;
+            this.state.expanded = {};
+            this.state.loaded = true;
+        }
+    }
+
+    toggleAccount(account) {
+        this.state.expanded[account.id] = !this.state.expanded[account.id];
+    }
+
+    formatAmount(value) {
+        return formatAmount(value);
+    }
+}
+
+registry.category("view_widgets").add("gl_ledger_viewer", {
+    component: GLLedgerViewer,
+});
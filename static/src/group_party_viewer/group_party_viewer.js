@@ -0,0 +1,106 @@
+/** @odoo-module **/
+
+import { Component, onWillStart, onWillUpdateProps, useState } from "@odoo/owl";
+import { serializeDate } from "@web/core/l10n/dates";
+import { rpc } from "@web/core/network/rpc";
+import { registry } from "@web/core/registry";
+import { standardWidgetProps } from "@web/views/widgets/standard_widget_props";
+import { formatAmount, many2oneId } from "@monstar_main/ledger_viewer/ledger_viewer_utils";
+
+/**
+ * group.party viewer: only the per-partner summary rows are loaded up
+ * front; a partner's lines (initial balance and running AR - AP balance)
+ * are fetched when its row is expanded and kept until the summary is
+ * loaded again (other filters, or the record was saved or refreshed).
+ */
+export class GroupPartyViewer extends Component {
+    static template = "monstar_main.GroupPartyViewer";
+    static props = { ...standardWidgetProps };
+
+    setup() {
+        this.state = useState({
+            partners: [],
+            totals: {},
+            consolidated: false,
+            expanded: {},
+            details: {},
+            loaded: false,
+        });
+        this.filtersKey = null;
+        // Partner details already fetched for the current summary
+        this.detailCache = new Map();
+        onWillStart(() => this.loadPartners(this.props));
+        onWillUpdateProps((nextProps) => this.loadPartners(nextProps));
+    }
+
+    getFilters(props) {
+        const data = props.record.data;
+        return {
+            date_from: data.date_from ? serializeDate(data.date_from) : false,
+            date_to: data.date_to ? serializeDate(data.date_to) : false,
+            partner_id: many2oneId(data.partner_id),
+            vendor_group: data.vendor_group || false,
+            company_id: many2oneId(data.company_id),
+            consolidate: data.consolidate,
+            open_items_only: data.open_items_only,
+        };
+    }
+
+    async loadPartners(props) {
+        const filters = this.getFilters(props);
+        // Saving or refreshing the record bumps write_date: reload then too
+        const filtersKey = JSON.stringify([filters, props.record.data.write_date]);
+        if (filtersKey === this.filtersKey) {
+            return;
+        }
+        this.filtersKey = filtersKey;
+        this.filters = filters;
+        this.detailCache = new Map();
+        const result = await rpc("/group_party/viewer/partners", {
+            filters,
+            record_id: props.record.resId || false,
+        });
+        if (filtersKey === this.filtersKey) {
+            this.state.partners = result.partners;
+            this.state.totals = result.totals;
+            this.state.consolidated = result.consolidated;
+            this.state.expanded = {};
+            this.state.details = {};
+            this.state.loaded = true;
+        }
+    }
+
+    async togglePartner(partner) {
+        const expanded = !this.state.expanded[partner.id];
+        this.state.expanded[partner.id] = expanded;
+        if (!expanded || this.state.details[partner.id]) {
+            return;
+        }
+        const filtersKey = this.filtersKey;
+        const detailCache = this.detailCache;
+        if (!detailCache.has(partner.id)) {
+            detailCache.set(
+                partner.id,
+                rpc("/group_party/viewer/lines", { partner_id: partner.id, filters: this.filters }).catch(
+                    (error) => {
+                        detailCache.delete(partner.id);
+                        throw error;
+                    }
+                )
+            );
+        }
+        const detail = await detailCache.get(partner.id);
+        if (filtersKey === this.filtersKey) {
+            this.state.details[partner.id] = detail;
+        }
+    }
+
+    formatAmount(value) {
+        return formatAmount(value);
+    }
+}
+
+registry.category("view_widgets").add("group_party_viewer", {
+    component: GroupPartyViewer,
+    fieldDependencies: [{ name: "write_date", type: "datetime" }],
+});
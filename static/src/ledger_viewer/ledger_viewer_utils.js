@@ -0,0 +1,18 @@
+/** @odoo-module **/
+
+import { formatFloat } from "@web/core/utils/numbers";
+
+/**
+ * Helpers shared by the ledger viewer widgets.
+ */
+
+export function many2oneId(value) {
+    if (!value) {
+        return false;
+    }
+    return Array.isArray(value) ? value[0] : value.id;
+}
+
+export function formatAmount(value) {
+    return formatFloat(value || 0, { digits: [false, 2] });
+}
@@ -0,0 +1,94 @@
+/** @odoo-module **/
+
+import { Component, onWillStart, onWillUpdateProps, useState } from "@odoo/owl";
+import { serializeDate } from "@web/core/l10n/dates";
+import { rpc } from "@web/core/network/rpc";
+import { registry } from "@web/core/registry";
+import { standardWidgetProps } from "@web/views/widgets/standard_widget_props";
+import { formatAmount, many2oneId } from "@monstar_main/ledger_viewer/ledger_viewer_utils";
+
+/**
+ * Partner Ledger Group viewer: only the per-partner overview is loaded up
+ * front; a partner's product lines are paged in when its row is expanded,
+ * on (date, id) keyset with the running balance carried over from the
+ * last loaded line.
+ */
+export class PLGLedgerViewer extends Component {
+    static template = "monstar_main.PLGLedgerViewer";
+    static props = { ...standardWidgetProps };
+
+    setup() {
+        this.state = useState({
+            partners: [],
+            loaded: false,
+        });
+        this.filtersKey = null;
+        onWillStart(() => this.loadPartners(this.props));
+        onWillUpdateProps((nextProps) => this.loadPartners(nextProps));
+    }
+
+    getFilters(props) {
+        const data = props.record.data;
+        return {
+            date_from: data.date_from ? serializeDate(data.date_from) : false,
+            date_to: data.date_to ? serializeDate(data.date_to) : false,
+            partner_id: many2oneId(data.partner_id),
+            company_id: many2oneId(data.company_id),
+            granularity: data.granularity,
+        };
+    }
+
+    async loadPartners(props) {
+        const filters = this.getFilters(props);
+        const filtersKey = JSON.stringify(filters);
+        if (filtersKey === this.filtersKey) {
+            return;
+        }
+        this.filtersKey = filtersKey;
+        this.filters = filters;
+        const result = await rpc("/partner_ledger_group/viewer/partners", { filters });
+        if (filtersKey === this.filtersKey) {
+            this.state.partners = result.partners.map((partner) => ({
+                ...partner,
+                lines: [],
+                expanded: false,
+                loading: false,
+            }));
+            this.state.loaded = true;
+        }
+    }
+
+    togglePartner(partner) {
+        partner.expanded = !partner.expanded;
+        if (partner.expanded && !partner.lines.length) {
+            this.loadMore(partner);
+        }
+    }
+
+    async loadMore(partner) {
+        if (partner.loading) {
+            return;
+        }
+        const filtersKey = this.filtersKey;
+        const last = partner.lines.at(-1);
+        partner.loading = true;
+        const page = await rpc("/partner_ledger_group/viewer/lines", {
+            partner_id: partner.id,
+            filters: this.filters,
+            after: last ? [last.date, last.id] : false,
+            seed: last ? last.balance : 0,
+        });
+        if (filtersKey === this.filtersKey) {
+            partner.lines.push(...page.lines);
+        }
+        partner.loading = false;
+    }
+
+    formatAmount(value) {
+        return formatAmount(value);
+    }
+}
+
+registry.category("view_widgets").add("plg_ledger_viewer", {
+    component: PLGLedgerViewer,
+});
@@ -0,0 +1,137 @@
+"""Standalone helpers of the General Ledger exports.
+
+The sharded export runs ``fetch_shard`` in spawned worker processes, which
+start from a fresh interpreter where ``odoo.addons`` has no addons path: this
+module is therefore imported by its own name (the addon puts this directory
+on ``sys.path``) and must not import Odoo nor anything from the addon.
+"""
+import io
+
+import psycopg2
+import xlsxwriter
+
+
+def prepare_line(line):
+    """Apply the label/ref fallbacks of the report to a fetched line dict."""
+    line['label'] = line['name'] or line['move_name']
+    line['ref'] = line['ref'] or line['move_name']
+    return line
+
+
+def write_general_ledger_sheet(workbook, sheet, ledger):
+    """Write the detailed GL layout of ``ledger`` (see general.ledger._get_ledger_data)
+    into ``sheet``. Rows are written strictly in order, so the sheet can be
+    used in constant_memory mode. Shared by the serial and sharded exports.
+    """
+    bold = workbook.add_format({'bold': True})
+    money = workbook.add_format({'num_format': '#,##0.00'})
+
+    # Column headers
+    row = 0
+    sheet.write(row, 0, "Account", bold)
+    sheet.write(row, 1, "Date", bold)
+    sheet.write(row, 2, "Label", bold)
+    sheet.write(row, 3, "Product Group", bold)
+    sheet.write(row, 4, "Counter Account", bold)
+    sheet.write(row, 5, "Debit", bold)
+    sheet.write(row, 6, "Credit", bold)
+    sheet.write(row, 7, "Balance", bold)
+    row += 1
+
+    for account_data in ledger:
+        opening_balance = account_data['opening_balance']
+        closing_balance = account_data['closing_balance']
+
+        # ---------------------------------------------------------
+        # 1) Account header row (always for included accounts)
+        # ---------------------------------------------------------
+        sheet.write(row, 0, account_data['label'], bold)
+        row += 1
+
+        # ---------------------------------------------------------
+        # 2) Summary row at TOP: Opening in Label, Closing text in Balance
+        # ---------------------------------------------------------
+        opening_text = f"Opening Balance: {opening_balance:,.2f}"
+        closing_text = f"Closing: {closing_balance:,.2f}"
+
+        sheet.write(row, 0, "")                 # Account col empty (header above)
+        sheet.write(row, 1, "")                 # Date
+        sheet.write(row, 2, opening_text)       # Label
+        sheet.write(row, 3, "")                 # Product Group
+        sheet.write(row, 4, "")                 # Counter Account
+        sheet.write(row, 5, "")                 # Debit empty
+        sheet.write(row, 6, "")                 # Credit empty
+        sheet.write(row, 7, closing_text)       # Balance: "Closing: xxx"
+        row += 1
+
+        # ---------------------------------------------------------
+        # 3) Detail rows for the period, written as they are fetched.
+        #     The running balance (opening + period movement) is
+        #     computed by the database.
+        # ---------------------------------------------------------
+        for line in account_data['lines']:
+            sheet.write(row, 0, "")
+            sheet.write(row, 1, str(line['date']))
+            sheet.write(row, 2, line['label'] or "")
+            sheet.write(row, 3, line['product_group'] or "")
+            sheet.write(row, 4, line['counter'] or "")
+            sheet.write_number(row, 5, line['debit'] or 0.0, money)
+            sheet.write_number(row, 6, line['credit'] or 0.0, money)
+            sheet.write_number(row, 7, line['balance'], money)  # opening+period
+            row += 1
+
+        # ---------------------------------------------------------
+        # 4) Bottom total row: period totals + closing balance
+        # ---------------------------------------------------------
+        sheet.write(row, 0, "")                    # Account
+        sheet.write(row, 1, "")                    # Date
+        sheet.write(row, 2, "Total")               # Label
+        sheet.write(row, 3, "")                    # Product Group
+        sheet.write(row, 4, "")                    # Counter Account
+        sheet.write_number(row, 5, account_data['period_debit'], money)
+        sheet.write_number(row, 6, account_data['period_credit'], money)
+        sheet.write_number(row, 7, closing_balance, money)
+        row += 1
+
+        row += 1  # Blank line between accounts
+
+
+def fetch_shard(connection_info, snapshot, query, params, shard, to_workbook):
+    """Run in a worker process: read one shard's period lines on a fresh,
+    read-only connection bound to the parent's snapshot, so every shard
+    sees exactly the same data as the serial export would.
+
+    Workers are spawned, not forked: they start from a clean interpreter
+    and only use this module, psycopg2 and xlsxwriter, never the parent's
+    registry, cursors, sockets or locks.
+    """
+    connection = psycopg2.connect(**connection_info)
+    try:
+        connection.set_session(
+            isolation_level=psycopg2.extensions.ISOLATION_LEVEL_REPEATABLE_READ,
+            readonly=True,
+        )
+        with connection.cursor() as cr:
+            cr.execute("SET TRANSACTION SNAPSHOT %s", (snapshot,))
+            cr.execute(query, params)
+            columns = [column.name for column in cr.description]
+            lines_by_account = {account_data['id']: [] for account_data in shard}
+            for values in cr:
+                line = prepare_line(dict(zip(columns, values)))
+                for field in ('debit', 'credit', 'balance'):
+                    line[field] = float(line[field] or 0.0)
+                lines_by_account[line['account_id']].append(line)
+        connection.rollback()
+    finally:
+        connection.close()
+
+    for account_data in shard:
+        account_data['lines'] = lines_by_account[account_data['id']]
+    if not to_workbook:
+        return shard
+
+    output = io.BytesIO()
+    workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+    write_general_ledger_sheet(workbook, workbook.add_worksheet('General Ledger'), shard)
+    workbook.close()
+    return output.getvalue()